@@ -6,25 +6,8 @@
 import streamlit as st
 import random
 import pandas as pd
-from llama_cpp import Llama
-
-# -----------------------------------------
-# CONFIG
-# -----------------------------------------
-MODEL_PATH = "tinyllama_lora_merged.gguf"
-MAX_NEW_TOKENS = 70
-
-# -----------------------------------------
-# BELIEF SYSTEMS
-# -----------------------------------------
-BELIEFS = {
-    "Hinduism": ["Bhagavad Gita", "Upanishads", "Ramayana"],
-    "Buddhism": ["Majjhima Nikaya", "Sutta Nipata"],
-    "Jainism": ["Acaranga Sutra", "Samayasara"],
-    "Christianity": ["Bible"],
-    "Islam": ["Quran"],
-    "Atheism": ["The Age of Reason", "Human Values"]
-}
+import model_backends
+from philosopher_engine import BELIEFS, build_prompt, generate
 
 # -----------------------------------------
 # UI SETUP
@@ -84,59 +67,11 @@ else:
 # -----------------------------------------
 @st.cache_resource
 def load_model():
-    llm = Llama(
-        model_path=MODEL_PATH,
-        n_ctx=2048,
-        n_threads=8,      # Adjust based on CPU cores
-        n_gpu_layers=0    # Set >0 if GPU offloading supported
-    )
-    return llm
-
-llm = load_model()
-
-# -----------------------------------------
-# GENERATION
-# -----------------------------------------
-def generate(prompt):
-    output = llm(
-        prompt,
-        max_tokens=MAX_NEW_TOKENS,
-        temperature=0.25,
-        top_p=0.85,
-        repeat_penalty=1.25,
-        stop=["Question:", "\n\n"]
-    )
-
-    text = output["choices"][0]["text"].strip()
-    text = text.replace("\n", " ")
-    sentences = text.split(". ")
-    return ". ".join(sentences[:2]).strip() + "."
-
-def build_prompt(belief, book, question):
-    return f"""
-You are a calm philosophical thinker representing {belief}.
-Base your reasoning only on the philosophical themes found in {book}.
-
-STRICT RESPONSE RULES:
-
-1. EXACTLY 2 sentences.
-2. Calm, emotionally neutral tone.
-3. No defense of any religion.
-4. No criticism of any religion.
-5. No superiority claims.
-6. Do not justify hate.
-7. Do not attack or support any belief.
-8. Do not describe historical facts.
-9. Do not repeat aggressive wording from the question.
-10. Focus only on inner psychological and philosophical insight.
-
-If the question expresses anger, rejection, or hatred, interpret it as a reflection of inner conflict and respond with wisdom about understanding, awareness, and self-examination.
-
-Question:
-{question}
+    # Settings: model_backends.LLAMA_SETTINGS["philosopher"], overridden
+    # by the host profile from llama_tuning.py
+    return model_backends.get_generator("philosopher").load()
 
-Answer:
-"""
+load_model()
 
 # -----------------------------------------
 # RUN
@@ -0,0 +1,246 @@
+import csv
+import glob
+import io
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+
+LOG_DIR = os.environ.get("ACTIVITY_LOG_DIR", "activity_logs")
+
+FIELDS = ["user_id", "date", "activity_type", "points_earned"]
+SUMMARY_FIELDS = ["user_id", "date", "activity_type", "events", "points_earned"]
+
+MAX_BUFFER = 10000              # events waiting for the writer thread
+MAX_BATCH = 500                 # events per group commit
+FLUSH_INTERVAL = 0.5            # seconds a batch may wait before commit
+MAX_SEGMENT_BYTES = 8 * 1024 * 1024
+
+# "always": fsync every group commit, "interval": at most once per
+# FSYNC_INTERVAL seconds, "never": leave it to the OS.
+FSYNC_POLICY = os.environ.get("ACTIVITY_FSYNC", "interval")
+FSYNC_INTERVAL = 5.0
+
+
+# -------- WRITER --------
+class ActivityLogWriter:
+    """
+    Background CSV writer for activity events.
+
+    Request handlers only put a tuple on a bounded queue; a single
+    thread drains it in batches and writes each batch with one write()
+    call (group commit). When the buffer is full events are dropped and
+    counted rather than blocking the request.
+
+    Segments live in LOG_DIR as activity-YYYY-MM-DD-<pid>-NNN.csv (one
+    set per worker process) and roll over at midnight or after
+    MAX_SEGMENT_BYTES.
+    """
+
+    def __init__(self, log_dir=LOG_DIR, fsync_policy=FSYNC_POLICY):
+        self.log_dir = log_dir
+        self.fsync_policy = fsync_policy
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = queue.Queue(maxsize=MAX_BUFFER)
+        self._file = None
+        self._day = None
+        self._last_fsync = 0.0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            os.makedirs(self.log_dir, exist_ok=True)
+            self._thread = threading.Thread(
+                target=self._run, name="activity-log-writer", daemon=True
+            )
+            self._thread.start()
+        return self
+
+    def log(self, user_id, activity_type, points_earned=0, day=None):
+        """
+        Queues one event. Never blocks.
+        """
+        event = (
+            "" if user_id is None else user_id,
+            (day or date.today()).isoformat(),
+            activity_type,
+            int(points_earned),
+        )
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def close(self, timeout=5):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ---- writer thread ----
+    def _run(self):
+        while not self._stop.is_set() or not self._queue.empty():
+            batch = self._collect()
+            if batch:
+                self._commit(batch)
+
+        if self._file is not None:
+            self._sync(force=True)
+            self._file.close()
+            self._file = None
+
+    def _collect(self):
+        try:
+            batch = [self._queue.get(timeout=FLUSH_INTERVAL)]
+        except queue.Empty:
+            return []
+
+        deadline = time.monotonic() + FLUSH_INTERVAL
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _commit(self, batch):
+        buf = io.StringIO()
+        csv.writer(buf).writerows(batch)
+
+        f = self._segment()
+        f.write(buf.getvalue())
+        f.flush()
+        self._sync()
+        self.written += len(batch)
+
+    def _sync(self, force=False):
+        if self.fsync_policy == "never" and not force:
+            return
+        now = time.monotonic()
+        if force or self.fsync_policy == "always" or now - self._last_fsync >= FSYNC_INTERVAL:
+            os.fsync(self._file.fileno())
+            self._last_fsync = now
+
+    def _segment(self):
+        today = date.today()
+        f = self._file
+        if f is not None and self._day == today and f.tell() < MAX_SEGMENT_BYTES:
+            return f
+
+        if f is not None:
+            self._sync(force=True)
+            f.close()
+
+        prefix = os.path.join(self.log_dir, f"activity-{today.isoformat()}-{os.getpid()}")
+        seq = len(glob.glob(prefix + "-*.csv"))
+        path = f"{prefix}-{seq:03d}.csv"
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        if self._file.tell() == 0:
+            csv.writer(self._file).writerow(FIELDS)
+        self._day = today
+        return self._file
+
+
+# -------- COMPACTION --------
+def _write_manifest(path, manifest):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, path)
+
+
+def compact(log_dir=LOG_DIR, before=None):
+    """
+    Rolls segments from days before `before` into per-user daily
+    summaries appended to daily_summary.csv, then deletes them.
+    The default (yesterday) leaves room for writers still finishing
+    the previous day's segment. Returns the number of segments compacted.
+
+    A batch is claimed by renaming its segments to *.compacting and
+    recorded in compact.manifest together with the summary size before
+    the append, so a run interrupted at any step is finished by the
+    next one without counting a segment twice.
+    """
+    manifest_path = os.path.join(log_dir, "compact.manifest")
+    summary_path = os.path.join(log_dir, "daily_summary.csv")
+
+    if os.path.exists(manifest_path):
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+    else:
+        before = (before or date.today() - timedelta(days=1)).isoformat()
+        # Leftover *.compacting files were claimed by a run that
+        # stopped before writing its manifest
+        segments = sorted(glob.glob(os.path.join(log_dir, "activity-*.csv.compacting")))
+        for path in sorted(glob.glob(os.path.join(log_dir, "activity-*.csv"))):
+            day = os.path.basename(path)[len("activity-"):len("activity-") + 10]
+            if day < before:
+                os.rename(path, path + ".compacting")
+                segments.append(path + ".compacting")
+
+        if not segments:
+            return 0
+
+        manifest = {
+            "segments": segments,
+            "summary_size": os.path.getsize(summary_path) if os.path.exists(summary_path) else 0,
+            "appended": False,
+        }
+        _write_manifest(manifest_path, manifest)
+
+    segments = manifest["segments"]
+    if not manifest["appended"]:
+        totals = defaultdict(lambda: [0, 0])
+        for path in segments:
+            with open(path, newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f):
+                    key = (row["user_id"], row["date"], row["activity_type"])
+                    totals[key][0] += 1
+                    try:
+                        totals[key][1] += int(row["points_earned"])
+                    except (TypeError, ValueError):
+                        pass
+
+        with open(summary_path, "a+", newline="", encoding="utf-8") as f:
+            # Drop whatever an interrupted append left behind
+            f.truncate(manifest["summary_size"])
+            writer = csv.writer(f)
+            if manifest["summary_size"] == 0:
+                writer.writerow(SUMMARY_FIELDS)
+            for (user_id, day, activity_type), (events, points) in sorted(totals.items()):
+                writer.writerow([user_id, day, activity_type, events, points])
+            f.flush()
+            os.fsync(f.fileno())
+
+        manifest["appended"] = True
+        _write_manifest(manifest_path, manifest)
+
+    for path in segments:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    os.remove(manifest_path)
+
+    return len(segments)
+
+
+# -------- Example Usage --------
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "compact":
+        n = compact()
+        print(f"{datetime.now().isoformat(timespec='seconds')} compacted {n} segment(s)")
+    else:
+        print("Usage: python activity_writer.py compact")
@@ -0,0 +1,269 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import metrics
+
+SIMILARITY_THRESHOLD = float(os.environ.get("PHILOSOPHER_CACHE_THRESHOLD", "0.8"))
+MAX_ENTRIES = int(os.environ.get("PHILOSOPHER_CACHE_SIZE", "5000"))
+N_FEATURES = 2 ** 18
+
+REBUILD_BATCH = 64      # rows added or removed before a partition restacks
+
+# Negations change the meaning of a question ("is god not real"), so
+# they are kept even though scikit-learn lists them as stop words, and
+# a cached answer is only reused when both questions negate the same way.
+KEEP_WORDS = {"no", "not", "nor", "never", "nothing", "none", "cannot"}
+
+# Inflections folded together when comparing content words
+SUFFIXES = ("ingly", "edly", "ness", "ment", "ings", "ing", "ied", "ies", "ed", "es", "ly", "s")
+
+
+def _stop_words():
+    from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+    return ENGLISH_STOP_WORDS - KEEP_WORDS
+
+
+def normalize_question(question, stop_words):
+    words = re.findall(r"[a-z0-9']+", question.lower())
+    return " ".join(w for w in words if w not in stop_words)
+
+
+def _stem(word):
+    for suffix in SUFFIXES:
+        if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+            return word[:-len(suffix)]
+    return word
+
+
+def question_terms(text):
+    """
+    (negations, content stems) of a normalized question.
+    """
+    negations = set()
+    content = set()
+    for word in text.split():
+        if word in KEEP_WORDS or word.endswith("n't"):
+            negations.add("not" if word.endswith("n't") else word)
+        else:
+            content.add(_stem(word.replace("'", "")))
+    return frozenset(negations), frozenset(content)
+
+
+def _one_edit_apart(a, b):
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) == len(b):
+        return a[i + 1:] == b[i + 1:]
+    return a[i:] == b[i + 1:]
+
+
+def _same_word(a, b):
+    # Typos in longer words still match; a different first letter
+    # ("danger" / "anger") never does
+    return a == b or (min(len(a), len(b)) >= 5 and a[0] == b[0] and _one_edit_apart(a, b))
+
+
+def same_question(terms, other):
+    """
+    True when two questions negate the same way and every content word
+    of each has a counterpart in the other. Character n-gram similarity
+    alone scores "anger" / "danger" or an added "not" as near-identical.
+    """
+    negations, content = terms
+    other_negations, other_content = other
+    if negations != other_negations:
+        return False
+    return all(any(_same_word(a, b) for b in other_content) for a in content) and all(
+        any(_same_word(a, b) for a in content) for b in other_content
+    )
+
+
+class _Partition:
+    """
+    Answers for one (belief, book).
+
+    Question vectors are stacked into a CSR matrix in batches: new rows
+    wait in a small pending list that is scored separately until
+    REBUILD_BATCH of them accumulate. Removal only marks the row dead;
+    dead rows are dropped at the next restack once they make up half of
+    the partition.
+    """
+
+    def __init__(self):
+        self._keys = []          # row -> key, None once removed
+        self._vectors = []       # row -> vector, None once removed
+        self._rows = {}          # key -> row
+        self._matrix = None      # rows [0, _stacked)
+        self._stacked = 0
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._rows)
+
+    def add(self, key, vector):
+        self._rows[key] = len(self._keys)
+        self._keys.append(key)
+        self._vectors.append(vector)
+        if len(self._keys) - self._stacked >= REBUILD_BATCH:
+            self._restack()
+
+    def remove(self, key):
+        row = self._rows.pop(key)
+        self._keys[row] = None
+        self._vectors[row] = None
+        self._dead += 1
+        if self._dead >= REBUILD_BATCH and self._dead * 2 >= len(self._keys):
+            self._compact()
+
+    def _restack(self):
+        from scipy.sparse import vstack
+
+        rows = [self._matrix] if self._matrix is not None else []
+        rows += self._pending()
+        self._matrix = vstack(rows).tocsr()
+        self._stacked = len(self._keys)
+
+    def _pending(self):
+        from scipy.sparse import csr_matrix
+
+        # Rows removed before being stacked stay as zero rows so row
+        # numbers keep matching _keys
+        return [
+            v if v is not None else csr_matrix((1, N_FEATURES))
+            for v in self._vectors[self._stacked:]
+        ]
+
+    def _compact(self):
+        live = [(k, v) for k, v in zip(self._keys, self._vectors) if k is not None]
+        self._keys = [k for k, _ in live]
+        self._vectors = [v for _, v in live]
+        self._rows = {k: i for i, k in enumerate(self._keys)}
+        self._matrix = None
+        self._stacked = 0
+        self._dead = 0
+        if self._keys:
+            self._restack()
+
+    def candidates(self, vector, threshold):
+        """
+        (score, key) of the live rows scoring at least `threshold`,
+        best first. Rows and query are L2-normalised, so the dot
+        product is the cosine.
+        """
+        import numpy as np
+        from scipy.sparse import vstack
+
+        parts = []
+        if self._matrix is not None:
+            parts.append((self._matrix @ vector.T).toarray().ravel())
+        if self._stacked < len(self._keys):
+            parts.append((vstack(self._pending()) @ vector.T).toarray().ravel())
+        if not parts:
+            return []
+
+        scores = np.concatenate(parts)
+        hits = np.flatnonzero(scores >= threshold)
+        hits = hits[np.argsort(-scores[hits], kind="stable")]
+        return [(float(scores[i]), self._keys[i]) for i in hits if self._keys[i] is not None]
+
+
+# -------- CACHE --------
+class SemanticAnswerCache:
+    """
+    Near-duplicate question cache for /ask_philosopher.
+
+    Questions are reduced to content words and hashed into character
+    n-gram vectors; a lookup returns the stored answer of the most
+    similar earlier question of the same belief when the cosine
+    similarity reaches `threshold` and both questions have the same
+    negations and content words (see same_question). Entries are evicted least recently
+    used first once `max_entries` is reached.
+    """
+
+    def __init__(self, threshold=SIMILARITY_THRESHOLD, max_entries=MAX_ENTRIES):
+        from sklearn.feature_extraction.text import HashingVectorizer
+
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._stop_words = _stop_words()
+        self._vectorizer = HashingVectorizer(
+            analyzer="char_wb",
+            ngram_range=(3, 5),
+            n_features=N_FEATURES,
+            alternate_sign=False,
+        )
+        self._entries = OrderedDict()     # (belief, book, text) -> answer
+        self._partitions = {}             # (belief, book) -> _Partition
+        self._lock = threading.Lock()
+
+    def _vector(self, text):
+        return self._vectorizer.transform([text])
+
+    def get(self, belief, books, question):
+        """
+        Returns (book, answer) for a near-duplicate question answered
+        from any of `books`, or None.
+        """
+        text = normalize_question(question, self._stop_words)
+        if not text:
+            metrics.cache_miss("philosopher_answers")
+            return None
+        vector = self._vector(text)
+
+        terms = question_terms(text)
+
+        with self._lock:
+            best_key = None
+            candidates = []
+            for book in books:
+                key = (belief, book, text)
+                if key in self._entries:
+                    best_key = key
+                    break
+                partition = self._partitions.get((belief, book))
+                if partition is not None:
+                    candidates += partition.candidates(vector, self.threshold)
+
+            if best_key is None:
+                candidates.sort(key=lambda c: -c[0])
+                for _, key in candidates:
+                    if same_question(terms, question_terms(key[2])):
+                        best_key = key
+                        break
+
+            if best_key is None:
+                metrics.cache_miss("philosopher_answers")
+                return None
+
+            self._entries.move_to_end(best_key)
+            metrics.cache_hit("philosopher_answers")
+            return best_key[1], self._entries[best_key]
+
+    def put(self, belief, book, question, answer):
+        text = normalize_question(question, self._stop_words)
+        if not text:
+            return
+        key = (belief, book, text)
+        vector = self._vector(text)
+
+        with self._lock:
+            if key in self._entries:
+                self._entries[key] = answer
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = answer
+            self._partitions.setdefault((belief, book), _Partition()).add(key, vector)
+
+            while len(self._entries) > self.max_entries:
+                old, _ = self._entries.popitem(last=False)
+                self._partitions[old[:2]].remove(old)
+
+    def __len__(self):
+        return len(self._entries)
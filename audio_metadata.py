@@ -0,0 +1,325 @@
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+
+import metrics
+from music_backend import AUDIO_ROOT
+
+INDEX_PATH = os.path.join(AUDIO_ROOT, ".metadata.json")
+INDEX_VERSION = 1
+
+# Bitrates in kbps, indexed by the 4-bit header field
+BITRATES = {
+    (1, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (1, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (1, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (2, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (2, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+BITRATES[(2, 3)] = BITRATES[(2, 2)]
+
+SAMPLE_RATES = {1: [44100, 48000, 32000], 2: [22050, 24000, 16000], 2.5: [11025, 12000, 8000]}
+
+TEXT_FRAMES = {"TIT2": "title", "TPE1": "artist", "TALB": "album"}
+TEXT_FRAMES_V22 = {"TT2": "title", "TP1": "artist", "TAL": "album"}
+
+
+# -------- MP3 FRAME HEADERS --------
+def parse_frame_header(header):
+    """
+    Decodes a 4-byte MPEG audio frame header. Returns a dict with
+    version, layer, bitrate (kbps), sample_rate, channels,
+    frame_length and samples, or None if the bytes are not a header.
+    """
+    if len(header) < 4:
+        return None
+    b1, b2, b3, b4 = header[:4]
+    if b1 != 0xFF or (b2 & 0xE0) != 0xE0:
+        return None
+
+    version = {0: 2.5, 2: 2, 3: 1}.get((b2 >> 3) & 0x03)
+    layer = {1: 3, 2: 2, 3: 1}.get((b2 >> 1) & 0x03)
+    bitrate_index = (b3 >> 4) & 0x0F
+    rate_index = (b3 >> 2) & 0x03
+    if version is None or layer is None or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    bitrate = BITRATES[(1 if version == 1 else 2, layer)][bitrate_index]
+    sample_rate = SAMPLE_RATES[version][rate_index]
+    padding = (b3 >> 1) & 0x01
+
+    if layer == 1:
+        samples = 384
+        frame_length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        samples = 1152 if (layer == 2 or version == 1) else 576
+        frame_length = samples // 8 * bitrate * 1000 // sample_rate + padding
+
+    return {
+        "version": version,
+        "layer": layer,
+        "bitrate": bitrate,
+        "sample_rate": sample_rate,
+        "channels": 1 if (b4 >> 6) == 3 else 2,
+        "frame_length": frame_length,
+        "samples": samples,
+    }
+
+
+def id3v2_size(head):
+    """
+    Total size of a leading ID3v2 tag (header included), 0 if absent.
+    """
+    if len(head) < 10 or head[:3] != b"ID3":
+        return 0
+    size = (head[6] << 21) | (head[7] << 14) | (head[8] << 7) | head[9]
+    footer = 10 if head[5] & 0x10 else 0
+    return 10 + size + footer
+
+
+def iter_frames(f, start, end):
+    """
+    Yields (offset, header) for consecutive MPEG frames between
+    byte offsets start and end, resynchronising over junk bytes.
+    """
+    offset = start
+    while offset + 4 <= end:
+        f.seek(offset)
+        header = parse_frame_header(f.read(4))
+        if header is None or header["frame_length"] <= 0:
+            offset += 1
+            continue
+        if offset + header["frame_length"] > end:
+            return
+        yield offset, header
+        offset += header["frame_length"]
+
+
+# -------- TAGS --------
+def _decode_text(payload):
+    if not payload:
+        return ""
+    encoding, data = payload[0], payload[1:]
+    codec = {0: "latin-1", 1: "utf-16", 2: "utf-16-be", 3: "utf-8"}.get(encoding, "latin-1")
+    return data.decode(codec, errors="replace").strip("\x00").strip()
+
+
+def parse_id3v2(tag):
+    """
+    Extracts title/artist/album text frames from a raw ID3v2 tag.
+    """
+    major = tag[3]
+    tags = {}
+    pos = 10
+
+    if major == 2:
+        while pos + 6 <= len(tag):
+            frame_id = tag[pos:pos + 3].decode("latin-1")
+            size = int.from_bytes(tag[pos + 3:pos + 6], "big")
+            if not frame_id.strip("\x00") or size == 0:
+                break
+            if frame_id in TEXT_FRAMES_V22:
+                tags[TEXT_FRAMES_V22[frame_id]] = _decode_text(tag[pos + 6:pos + 6 + size])
+            pos += 6 + size
+        return tags
+
+    while pos + 10 <= len(tag):
+        frame_id = tag[pos:pos + 4].decode("latin-1")
+        raw = tag[pos + 4:pos + 8]
+        if major == 4:
+            size = (raw[0] << 21) | (raw[1] << 14) | (raw[2] << 7) | raw[3]
+        else:
+            size = struct.unpack(">I", raw)[0]
+        if not frame_id.strip("\x00") or size == 0:
+            break
+        if frame_id in TEXT_FRAMES:
+            tags[TEXT_FRAMES[frame_id]] = _decode_text(tag[pos + 10:pos + 10 + size])
+        pos += 10 + size
+    return tags
+
+
+def parse_id3v1(tail):
+    if len(tail) != 128 or tail[:3] != b"TAG":
+        return {}
+    fields = {"title": tail[3:33], "artist": tail[33:63], "album": tail[63:93]}
+    return {
+        k: v.split(b"\x00")[0].decode("latin-1").strip()
+        for k, v in fields.items()
+        if v.strip(b"\x00 ")
+    }
+
+
+def _xing_frames(frame, header):
+    """
+    Frame count from a Xing/Info or VBRI header inside the first frame.
+    """
+    if header["version"] == 1:
+        side_info = 17 if header["channels"] == 1 else 32
+    else:
+        side_info = 9 if header["channels"] == 1 else 17
+
+    xing = 4 + side_info
+    if frame[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", frame[xing + 4:xing + 8])[0]
+        if flags & 0x01:
+            return struct.unpack(">I", frame[xing + 8:xing + 12])[0]
+
+    if frame[36:40] == b"VBRI":
+        return struct.unpack(">I", frame[50:54])[0]
+    return None
+
+
+# -------- FILE METADATA --------
+def read_metadata(path):
+    """
+    Reads tags and stream parameters of one MP3 file. Duration comes
+    from the Xing/VBRI frame count when present, otherwise from a walk
+    over the frame headers.
+    """
+    st = os.stat(path)
+    size = st.st_size
+    sha256 = hashlib.sha256()
+
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            sha256.update(chunk)
+
+        f.seek(0)
+        head = f.read(10)
+        tag_size = id3v2_size(head)
+        tags = {}
+        if tag_size:
+            f.seek(0)
+            tags = parse_id3v2(f.read(tag_size))
+
+        audio_end = size
+        if size >= 128:
+            f.seek(size - 128)
+            v1 = parse_id3v1(f.read(128))
+            if v1:
+                audio_end -= 128
+                for k, v in v1.items():
+                    tags.setdefault(k, v)
+
+        frames = 0
+        samples = 0
+        first = None
+        for offset, header in iter_frames(f, tag_size, audio_end):
+            if first is None:
+                first = header
+                f.seek(offset)
+                counted = _xing_frames(f.read(header["frame_length"]), header)
+                if counted:
+                    frames = counted
+                    samples = counted * header["samples"]
+                    break
+            frames += 1
+            samples += header["samples"]
+
+    duration = samples / first["sample_rate"] if first else 0.0
+    audio_bytes = audio_end - tag_size
+    bitrate = round(audio_bytes * 8 / duration / 1000) if duration else (first or {}).get("bitrate", 0)
+
+    return {
+        "title": tags.get("title") or os.path.splitext(os.path.basename(path))[0],
+        "artist": tags.get("artist", ""),
+        "album": tags.get("album", ""),
+        "duration": round(duration, 3),
+        "bitrate": bitrate,
+        "sample_rate": first["sample_rate"] if first else 0,
+        "channels": first["channels"] if first else 0,
+        "size": size,
+        "sha256": sha256.hexdigest(),
+        "mtime_ns": st.st_mtime_ns,
+    }
+
+
+# -------- SIDECAR INDEX --------
+class MetadataIndex:
+    """
+    Persistent per-file metadata keyed by path relative to AUDIO_ROOT.
+
+    Entries are reused while a file's size and mtime are unchanged, so
+    audio bytes are only read the first time a file is seen or after
+    it changes. The index is saved as JSON next to the audio folders.
+    """
+
+    def __init__(self, index_path=INDEX_PATH, root=AUDIO_ROOT):
+        self.index_path = index_path
+        self.root = root
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.index_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == INDEX_VERSION:
+            self._entries = data.get("files", {})
+
+    def _save(self):
+        # A temp file per call: workers saving at once must not truncate
+        # each other's file before it is renamed into place
+        fd, tmp = tempfile.mkstemp(
+            dir=os.path.dirname(self.index_path), prefix=".metadata-", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump({"version": INDEX_VERSION, "files": self._entries}, f, indent=1)
+            # mkstemp creates 0600; keep the index readable like before
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, self.index_path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+    def get(self, path):
+        """
+        Metadata for one file, re-indexing it if it changed on disk.
+        """
+        key = os.path.relpath(path, self.root)
+        st = os.stat(path)
+        entry = self._entries.get(key)
+        if entry and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns:
+            metrics.cache_hit("audio_metadata")
+            return entry
+
+        metrics.cache_miss("audio_metadata")
+        entry = read_metadata(path)
+        with self._lock:
+            self._entries[key] = entry
+            self._save()
+        return entry
+
+    def prune(self, paths):
+        """
+        Drops entries for files no longer in the library.
+        """
+        keep = {os.path.relpath(p, self.root) for p in paths}
+        with self._lock:
+            stale = [k for k in self._entries if k not in keep]
+            for k in stale:
+                del self._entries[k]
+            if stale:
+                self._save()
+
+
+# -------- Example Usage --------
+if __name__ == "__main__":
+    from music_backend import load_library, get_audio_path
+
+    index = MetadataIndex()
+    paths = []
+    for religion, songs in load_library().items():
+        for song in songs:
+            path = get_audio_path(religion, song)
+            paths.append(path)
+            meta = index.get(path)
+            print(f"{religion}/{song}: {meta['duration']:.1f}s {meta['bitrate']} kbps")
+    index.prune(paths)
@@ -0,0 +1,102 @@
+"""
+Shared helpers for the benchmark scripts: percentiles, environment
+setup and JSON result files for regression comparison.
+"""
+
+import json
+import math
+import os
+import platform
+import sys
+import tempfile
+from datetime import datetime
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(sorted_values, q):
+    """
+    Nearest-rank percentile of an already sorted list (q in 0..100).
+    """
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+def summarize(samples):
+    """
+    Latency summary in milliseconds for a list of seconds.
+    """
+    values = sorted(samples)
+    n = len(values)
+    return {
+        "count": n,
+        "mean_ms": round(sum(values) / n * 1000, 4) if n else 0.0,
+        "p50_ms": round(percentile(values, 50) * 1000, 4),
+        "p95_ms": round(percentile(values, 95) * 1000, 4),
+        "p99_ms": round(percentile(values, 99) * 1000, 4),
+        "max_ms": round(values[-1] * 1000, 4) if n else 0.0,
+    }
+
+
+def prepare_app_env():
+    """
+    Runs from the repo root (datasets are opened by relative path) and
+    points the progress and jobs DBs, activity logs, request profiles
+    and shared cache at a scratch directory so benchmarks never touch
+    real data.
+    """
+    os.chdir(REPO_ROOT)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+
+    scratch = tempfile.mkdtemp(prefix="bench-")
+    os.environ.setdefault("PROGRESS_DB", os.path.join(scratch, "progress.db"))
+    os.environ.setdefault("ACTIVITY_LOG_DIR", os.path.join(scratch, "activity_logs"))
+    os.environ.setdefault("HLS_ROOT", os.path.join(scratch, "audio_hls"))
+    # main resumes queued jobs on import; real ones must not run on fakes
+    os.environ.setdefault("JOBS_DB", os.path.join(scratch, "jobs.db"))
+    os.environ.setdefault("PROFILE_DIR", os.path.join(scratch, "profiles"))
+    # SHARED_CACHE=none measures the uncached model path
+    os.environ.setdefault("SHARED_CACHE_PATH", os.path.join(scratch, "shared_cache.db"))
+
+
+def save_results(kind, results, params):
+    """
+    Writes results to benchmarks/results/<kind>-<timestamp>.json and
+    returns the path.
+    """
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(RESULTS_DIR, f"{kind}-{stamp}.json")
+    payload = {
+        "kind": kind,
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "params": params,
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return path
+
+
+def compare(results, baseline_path, metric):
+    """
+    Prints the change of `metric` per benchmark against a saved run.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+
+    print(f"\nvs {baseline_path} ({metric})")
+    for name, row in results.items():
+        old = baseline.get(name, {}).get(metric)
+        new = row.get(metric)
+        if not old or new is None:
+            print(f"  {name:<40} {new!s:>12}   (no baseline)")
+            continue
+        change = (new - old) / old * 100
+        print(f"  {name:<40} {old:>12.4f} -> {new:>12.4f}  {change:+7.1f}%")
@@ -0,0 +1,138 @@
+"""
+Deterministic stand-ins for the llama.cpp and NLLB backends.
+
+They return canned text shaped like real model output (sentences,
+numbered steps) and sleep for a configurable per-token latency, so the
+API can be measured offline with realistic timing.
+"""
+
+import random
+import time
+
+import stop_criteria
+
+QUOTE_SENTENCES = [
+    "True peace is found when the mind stops chasing what it cannot hold.",
+    "The self that watches the storm is never touched by the rain.",
+    "Every act done without craving becomes a quiet prayer of freedom.",
+    "Wisdom begins the moment we see our own reflection in another being.",
+]
+
+STORY_SENTENCES = [
+    "A young disciple asked his teacher why the river never stopped moving.",
+    "The teacher placed a leaf on the water and watched it drift away quietly.",
+    "Holding on to the leaf would not have stopped the river from flowing onward.",
+    "The disciple understood that letting go was not loss but a kind of trust.",
+    "From that day he carried his worries the way the river carries leaves.",
+    "Years later he taught the same lesson beside the same patient river.",
+]
+
+PATHWAY_STEPS = [
+    "Begin with disciplined daily study of the scripture and steady self-restraint.",
+    "Practice selfless action, offering the fruits of every deed without attachment.",
+    "Cultivate devotion through prayer, chanting and remembrance of the divine name.",
+    "Develop concentration through regular meditation on the breath and the heart.",
+    "Study the nature of the self and discriminate the eternal from the passing.",
+    "Serve the teacher and the community with humility, patience and compassion.",
+    "Withdraw the senses and rest the mind in stillness beyond thoughts and desires.",
+    "Realize the self as one with the ultimate reality and attain final liberation.",
+    "Continue to live in the world as a liberated being guiding other sincere seekers.",
+]
+
+TOKENS_PER_WORD = 1.3
+
+
+def count_tokens(text):
+    return max(1, int(len(text.split()) * TOKENS_PER_WORD))
+
+
+class FakeGenerator:
+    """
+    Callable like llama_cpp.Llama. Consumes the whole max_tokens budget
+    (as the real model does) unless a stop_when spec ends it earlier,
+    and sleeps prefill_latency per prompt token plus token_latency per
+    generated token.
+    """
+
+    def __init__(self, token_latency=0.02, prefill_latency=0.0005, seed=0):
+        self.token_latency = token_latency
+        self.prefill_latency = prefill_latency
+        self._rng = random.Random(seed)
+
+    def load(self):
+        return self
+
+    def _sentences(self, prompt):
+        if "numbered steps" in prompt:
+            return [f"{i}. {s}" for i, s in enumerate(PATHWAY_STEPS, 1)]
+        if "story" in prompt:
+            return STORY_SENTENCES
+        return self._rng.sample(QUOTE_SENTENCES, len(QUOTE_SENTENCES))
+
+    def _text(self, prompt, max_tokens):
+        sentences = self._sentences(prompt)
+        limit = max(1, int(max_tokens / TOKENS_PER_WORD))
+        words = []
+        i = 0
+        while len(words) < limit:
+            words.extend(sentences[i % len(sentences)].split())
+            i += 1
+        return " " + " ".join(words[:limit])
+
+    def __call__(self, prompt, max_tokens=16, stop_when=None, **kwargs):
+        text = self._text(prompt, max_tokens)
+        finish_reason = "length"
+        if stop_when is not None:
+            criterion = stop_criteria.build(stop_when)
+            words = text.split(" ")
+            for i, word in enumerate(words):
+                if criterion.feed(word + " "):
+                    text = " ".join(words[:i + 1])
+                    finish_reason = stop_criteria.STOP_REASON
+                    break
+        prompt_tokens = count_tokens(prompt)
+        completion_tokens = count_tokens(text)
+
+        time.sleep(prompt_tokens * self.prefill_latency + completion_tokens * self.token_latency)
+
+        return {
+            "choices": [{"text": text, "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+class FakeTranslator:
+    """
+    Same interface as model_backends.NllbTranslator; tags the text with
+    the target language code after sleeping token_latency per token.
+    """
+
+    def __init__(self, token_latency=0.01):
+        self.token_latency = token_latency
+
+    def load(self):
+        return self
+
+    def translate(self, text, lang_code):
+        time.sleep(count_tokens(text) * self.token_latency)
+        return f"[{lang_code}] {text}"
+
+    def translate_many(self, text, lang_codes):
+        # Batched decode: roughly one pass plus a small per-target cost
+        time.sleep(count_tokens(text) * self.token_latency * (1 + 0.2 * (len(lang_codes) - 1)))
+        return {code: f"[{code}] {text}" for code in lang_codes}
+
+
+def install(token_latency=0.02, prefill_latency=0.0005, translate_latency=0.01, seed=0):
+    """
+    Registers the fakes with model_backends for every caller.
+    Must run before main / wisdom_engine are imported.
+    """
+    import model_backends
+
+    model_backends.set_generator(FakeGenerator(token_latency, prefill_latency, seed))
+    model_backends.set_translator(FakeTranslator(translate_latency))
@@ -0,0 +1,143 @@
+"""
+Concurrent HTTP load driver.
+
+    python -m benchmarks.load [--url http://host:port] [--concurrency 16] [--duration 10]
+                              [--endpoint PATH ...] [--token-latency-ms 20] [--compare FILE]
+
+Without --url the API is started in-process (uvicorn on a free local
+port) with the fake model backends, so runs are repeatable offline.
+Reports p50/p95/p99 latency, throughput and errors per endpoint and
+saves them as JSON.
+"""
+
+import argparse
+import http.client
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from benchmarks import common, fake_backends
+
+DEFAULT_ENDPOINTS = [
+    "/daily_wisdom?religion=Hindu&content_type=Quote&language=English",
+    "/daily_wisdom?religion=Hindu&content_type=Pathway&language=Tamil",
+    "/ask_philosopher?question=Why%20do%20humans%20feel%20anxious%20about%20the%20future&beliefs=Hindu",
+    "/landmarks?religion=Hindu",
+    "/diet?religion=Hindu&diet_type=Vegetarian&age=30&gender=Female&weight=60&height=165&activity=Moderate",
+    "/riddle",
+    "/music/list_songs?religion=Hindu",
+]
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_local_server(args):
+    """
+    Starts main:app with the fake backends in a background thread and
+    returns its base URL once it accepts connections.
+    """
+    common.prepare_app_env()
+    fake_backends.install(
+        token_latency=args.token_latency_ms / 1000,
+        prefill_latency=args.prefill_latency_ms / 1000,
+        translate_latency=args.translate_latency_ms / 1000,
+    )
+
+    import uvicorn
+    import main
+
+    port = _free_port()
+    config = uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+
+    deadline = time.monotonic() + 30
+    while not server.started:
+        if time.monotonic() > deadline:
+            raise RuntimeError("local server did not start")
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}"
+
+
+def drive(base_url, path, concurrency, duration):
+    """
+    Runs `concurrency` keep-alive clients against one path for
+    `duration` seconds. Returns (latencies, errors, elapsed).
+    """
+    url = urlsplit(base_url)
+    stop_at = time.monotonic() + duration
+    latencies, errors = [], [0]
+    lock = threading.Lock()
+
+    def worker():
+        conn = http.client.HTTPConnection(url.hostname, url.port, timeout=300)
+        mine = []
+        failed = 0
+        while time.monotonic() < stop_at:
+            start = time.perf_counter()
+            try:
+                conn.request("GET", path)
+                response = conn.getresponse()
+                response.read()
+                if response.status >= 400:
+                    failed += 1
+                    continue
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                conn.close()
+                conn = http.client.HTTPConnection(url.hostname, url.port, timeout=300)
+                continue
+            mine.append(time.perf_counter() - start)
+        conn.close()
+        with lock:
+            latencies.extend(mine)
+            errors[0] += failed
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        for _ in range(concurrency):
+            pool.submit(worker)
+    return latencies, errors[0], time.monotonic() - started
+
+
+def run(args):
+    base_url = args.url or start_local_server(args)
+    endpoints = args.endpoint or DEFAULT_ENDPOINTS
+
+    results = {}
+    for path in endpoints:
+        latencies, errors, elapsed = drive(base_url, path, args.concurrency, args.duration)
+        row = common.summarize(latencies)
+        row["errors"] = errors
+        row["throughput_rps"] = round(len(latencies) / elapsed, 2) if elapsed else 0.0
+        results[path] = row
+        print(
+            f"{path[:60]:<60} {row['throughput_rps']:>9.1f} req/s  "
+            f"p50 {row['p50_ms']:>9.1f}  p95 {row['p95_ms']:>9.1f}  p99 {row['p99_ms']:>9.1f} ms  "
+            f"errors {errors}"
+        )
+
+    path = common.save_results("load", results, vars(args))
+    print(f"\nSaved {path}")
+
+    if args.compare:
+        common.compare(results, args.compare, "p95_ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", help="existing server; default starts one with fake backends")
+    parser.add_argument("--endpoint", action="append", help="path with query string (repeatable)")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds per endpoint")
+    parser.add_argument("--token-latency-ms", type=float, default=20.0)
+    parser.add_argument("--prefill-latency-ms", type=float, default=0.5)
+    parser.add_argument("--translate-latency-ms", type=float, default=10.0)
+    parser.add_argument("--compare", help="earlier load-*.json to diff against")
+    run(parser.parse_args())
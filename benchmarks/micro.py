@@ -0,0 +1,108 @@
+"""
+Micro-benchmarks for the hot pure-Python paths of the API.
+
+    python -m benchmarks.micro [--min-time 0.2] [--repeat 5] [--compare results/micro-....json]
+
+Model calls are replaced by the deterministic fakes, so only our own
+code (prompt building, output cleaning, dataset filtering) is timed.
+"""
+
+import argparse
+import random
+import time
+
+from benchmarks import common, fake_backends
+
+
+def bench(fn, min_time=0.2, repeat=5):
+    """
+    Times fn() in batches sized to run at least min_time seconds and
+    returns per-call statistics in microseconds over `repeat` batches.
+    """
+    def batch(number):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        return time.perf_counter() - start
+
+    number = 1
+    while number < 1_000_000:
+        elapsed = batch(number)
+        if elapsed >= min_time:
+            break
+        number *= 2 if elapsed >= min_time / 10 else 10
+
+    per_call = []
+    for _ in range(repeat):
+        per_call.append(batch(number) / number)
+
+    per_call.sort()
+    return {
+        "calls_per_batch": number,
+        "best_us": round(per_call[0] * 1e6, 3),
+        "median_us": round(per_call[len(per_call) // 2] * 1e6, 3),
+        "worst_us": round(per_call[-1] * 1e6, 3),
+    }
+
+
+def cases():
+    import wisdom_engine as wisdom
+    import philosopher_engine as philosopher
+    import main
+
+    fake = fake_backends.FakeGenerator(token_latency=0, prefill_latency=0)
+    raw = {
+        ct: fake(wisdom.build_prompt("Hinduism", "Bhagavad Gita", ct), max_tokens=mt)["choices"][0]["text"]
+        for ct, mt in [
+            ("Quote", wisdom.MAX_TOKENS_QUOTE),
+            ("Short Story", wisdom.MAX_TOKENS_STORY),
+            ("Pathway", wisdom.MAX_TOKENS_PATHWAY),
+        ]
+    }
+
+    return {
+        "clean_output[Quote]": lambda: wisdom.clean_output(raw["Quote"], "Quote"),
+        "clean_output[Short Story]": lambda: wisdom.clean_output(raw["Short Story"], "Short Story"),
+        "clean_output[Pathway]": lambda: wisdom.clean_output(raw["Pathway"], "Pathway"),
+        "wisdom.build_prompt[Pathway]": lambda: wisdom.build_prompt("Hinduism", "Bhagavad Gita", "Pathway"),
+        "philosopher.build_prompt": lambda: philosopher.build_prompt(
+            "Buddhism", "Sutta Nipata", "Why do humans feel anxious about the future?"
+        ),
+        "landmark_records[Hindu/All]": lambda: main.landmark_records(
+            main.landmarks.df, main.ReligionEnum.Hindu, main.StateEnum.All
+        ),
+        "landmark_records[All/Kerala]": lambda: main.landmark_records(
+            main.landmarks.df, main.ReligionEnum.All, main.StateEnum.Kerala
+        ),
+        "generate_diet": lambda: main.generate_diet(
+            main.ReligionEnum.Hindu, main.DietTypeEnum.Vegetarian, 30,
+            main.GenderEnum.Female, 60.0, 165.0, main.ActivityEnum.Moderate
+        ),
+        "get_riddle": lambda: main.get_riddle(),
+    }
+
+
+def run(args):
+    common.prepare_app_env()
+    fake_backends.install(token_latency=0, prefill_latency=0, translate_latency=0)
+    random.seed(0)
+
+    results = {}
+    for name, fn in cases().items():
+        results[name] = bench(fn, args.min_time, args.repeat)
+        r = results[name]
+        print(f"{name:<32} median {r['median_us']:>12.3f} us   best {r['best_us']:>12.3f} us")
+
+    path = common.save_results("micro", results, vars(args))
+    print(f"\nSaved {path}")
+
+    if args.compare:
+        common.compare(results, args.compare, "median_us")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-time", type=float, default=0.2, help="seconds per timing batch")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--compare", help="earlier micro-*.json to diff against")
+    run(parser.parse_args())
@@ -0,0 +1,115 @@
+"""
+Decode throughput with and without prompt-lookup speculative decoding.
+
+    python -m benchmarks.speculative [--draft-tokens 2,4,10] [--max-tokens 200] [--repeat 2] [--compare results/speculative-....json]
+
+Each configuration loads the real GGUF model (a model_backends.LlamaGenerator
+with the given speculative mode) and completes a Pathway prompt and a
+philosopher prompt greedily (temperature 0). Decode tokens/sec comes from
+the completion length and its wall time minus that of a 1-token run, both
+started from an empty KV cache. `matches_baseline` checks that
+speculation left the greedy text unchanged.
+"""
+
+import argparse
+import time
+
+from benchmarks import common
+
+
+def prompts():
+    import philosopher_engine
+    from llama_tuning import BENCH_PROMPT
+
+    question = "Why do people suffer even when they follow the Dhammapada?"
+    return {
+        "pathway": BENCH_PROMPT,
+        "philosopher": philosopher_engine.build_prompt("Buddhism", "Sutta Nipata", question),
+    }
+
+
+def measure(generator, prompt, max_tokens, repeat):
+    """
+    Best-of-`repeat` decode tokens/sec for one prompt, and the text.
+    """
+    best = 0.0
+    text = ""
+    tokens = 0
+    for _ in range(repeat):
+        # llama.cpp reuses a matching prompt prefix from its KV cache;
+        # without a reset the second call would skip prefill and the
+        # subtraction below would overstate decode speed
+        generator.reset()
+        start = time.perf_counter()
+        generator(prompt, max_tokens=1, temperature=0)
+        prefill_s = time.perf_counter() - start
+
+        generator.reset()
+        start = time.perf_counter()
+        out = generator(prompt, max_tokens=max_tokens, temperature=0)
+        total_s = time.perf_counter() - start
+
+        text = out["choices"][0]["text"]
+        tokens = out["usage"]["completion_tokens"]
+        decode_s = max(total_s - prefill_s, 1e-9)
+        best = max(best, (tokens - 1) / decode_s)
+    return best, tokens, text
+
+
+def run(args):
+    common.prepare_app_env()
+    import model_backends
+
+    configs = [("off", 0)] + [
+        ("prompt_lookup", int(n)) for n in args.draft_tokens.split(",") if n.strip()
+    ]
+
+    results = {}
+    baseline = {}
+    for mode, draft_tokens in configs:
+        generator = model_backends.LlamaGenerator(
+            model_backends.GGUF_MODEL_PATH,
+            name="speculative",
+            speculative=mode,
+            draft_tokens=draft_tokens or model_backends.LLAMA_DRAFT_TOKENS,
+            verbose=False,
+            **model_backends.llama_settings(args.settings),
+        ).load()
+
+        for label, prompt in prompts().items():
+            tps, tokens, text = measure(generator, prompt, args.max_tokens, args.repeat)
+            name = f"{label}/{mode}" + (f"/draft={draft_tokens}" if draft_tokens else "")
+            if mode == "off":
+                baseline[label] = text
+            results[name] = {
+                "decode_tok_s": round(tps, 2),
+                "completion_tokens": tokens,
+                "matches_baseline": text == baseline.get(label),
+            }
+        del generator
+
+    for name, r in results.items():
+        speedup = ""
+        base = results.get(name.split("/")[0] + "/off")
+        if base and base["decode_tok_s"]:
+            speedup = f"x{r['decode_tok_s'] / base['decode_tok_s']:.2f}"
+        print(
+            f"{name:<40} {r['decode_tok_s']:>8.2f} tok/s  {speedup:>6}  "
+            f"tokens {r['completion_tokens']:>4}  same output {r['matches_baseline']}"
+        )
+
+    path = common.save_results("speculative", results, vars(args))
+    print(f"\nSaved {path}")
+
+    if args.compare:
+        common.compare(results, args.compare, "decode_tok_s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--draft-tokens", default="2,4,10")
+    parser.add_argument("--max-tokens", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--settings", default="philosopher", help="LLAMA_SETTINGS entry to load with")
+    parser.add_argument("--compare", help="earlier speculative-*.json to diff against")
+    run(parser.parse_args())
@@ -0,0 +1,130 @@
+"""
+Accuracy versus latency of the fp32 and int8 NLLB translation backends.
+
+    python -m benchmarks.translation [--languages hin_Deva,tam_Taml] [--repeat 3] [--compare results/translation-....json]
+
+Both backends translate the same English quotes, story sentences and
+pathway steps. Latency is measured per call; accuracy is the chrF score
+of the int8 output against the fp32 output (100 = identical), since the
+quantized model is meant to reproduce the full-precision one.
+"""
+
+import argparse
+import io
+import time
+from collections import Counter
+
+from benchmarks import common, fake_backends
+
+# NLLB codes, as in wisdom_engine.LANGUAGES
+DEFAULT_LANGUAGES = ["hin_Deva", "tam_Taml", "mal_Mlym", "ben_Beng"]
+
+
+def sample_texts():
+    return (
+        fake_backends.QUOTE_SENTENCES
+        + fake_backends.STORY_SENTENCES[:3]
+        + fake_backends.PATHWAY_STEPS[:3]
+    )
+
+
+def chrf(hypothesis, reference, max_n=6, beta=2.0):
+    """
+    Character n-gram F-score (chrF, Popovic 2015) on a 0-100 scale.
+    """
+    hyp = hypothesis.replace(" ", "")
+    ref = reference.replace(" ", "")
+    precisions, recalls = [], []
+    for n in range(1, max_n + 1):
+        h = Counter(hyp[i:i + n] for i in range(len(hyp) - n + 1))
+        r = Counter(ref[i:i + n] for i in range(len(ref) - n + 1))
+        if not h or not r:
+            continue
+        overlap = sum((h & r).values())
+        precisions.append(overlap / sum(h.values()))
+        recalls.append(overlap / sum(r.values()))
+    if not precisions:
+        return 100.0 if hyp == ref else 0.0
+
+    p = sum(precisions) / len(precisions)
+    r = sum(recalls) / len(recalls)
+    if p == 0 and r == 0:
+        return 0.0
+    return 100 * (1 + beta ** 2) * p * r / (beta ** 2 * p + r)
+
+
+def model_size_mb(translator):
+    import torch
+
+    buf = io.BytesIO()
+    torch.save(translator.model.state_dict(), buf)
+    return round(buf.tell() / 1024 / 1024, 1)
+
+
+def measure(translator, texts, lang_codes, repeat):
+    outputs = {}
+    samples = []
+    for lang_code in lang_codes:
+        for text in texts:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                outputs[(lang_code, text)] = translator.translate(text, lang_code)
+                samples.append(time.perf_counter() - start)
+    return outputs, common.summarize(samples)
+
+
+def run(args):
+    common.prepare_app_env()
+    import model_backends
+
+    texts = sample_texts()
+    lang_codes = [c.strip() for c in args.languages.split(",") if c.strip()]
+
+    results = {}
+    outputs = {}
+    for backend in ("fp32", "int8"):
+        translator = model_backends.local_translator(backend)
+        start = time.perf_counter()
+        translator.load()
+        load_s = time.perf_counter() - start
+
+        # Warm-up so one-time allocation does not count as latency
+        translator.translate(texts[0], lang_codes[0])
+
+        outputs[backend], latency = measure(translator, texts, lang_codes, args.repeat)
+        results[backend] = {
+            **latency,
+            "load_s": round(load_s, 2),
+            "size_mb": model_size_mb(translator),
+        }
+        del translator
+
+    for backend in results:
+        scores = [
+            chrf(outputs[backend][key], outputs["fp32"][key])
+            for key in outputs["fp32"]
+        ]
+        identical = sum(outputs[backend][key] == outputs["fp32"][key] for key in outputs["fp32"])
+        results[backend]["chrf_vs_fp32"] = round(sum(scores) / len(scores), 2)
+        results[backend]["identical_pct"] = round(identical / len(scores) * 100, 1)
+
+    for backend, r in results.items():
+        print(
+            f"{backend:<5} p50 {r['p50_ms']:>9.1f} ms  p95 {r['p95_ms']:>9.1f} ms  "
+            f"size {r['size_mb']:>7.1f} MB  chrF {r['chrf_vs_fp32']:>6.2f}  "
+            f"identical {r['identical_pct']:>5.1f}%"
+        )
+
+    path = common.save_results("translation", results, vars(args))
+    print(f"\nSaved {path}")
+
+    if args.compare:
+        common.compare(results, args.compare, "p50_ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--languages", default=",".join(DEFAULT_LANGUAGES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--compare", help="earlier translation-*.json to diff against")
+    run(parser.parse_args())
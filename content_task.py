@@ -1,6 +1,8 @@
 import streamlit as st
 import pandas as pd
 import random
+from riddle_engine import load_answer_table
+from progress_engine import ProgressEngine, title_for_points
 
 # ------------------------------------------------
 # PAGE CONFIG
@@ -18,6 +20,18 @@ def load_data():
 
 df = load_data()
 
+@st.cache_resource
+def load_answers():
+    return load_answer_table(df.fillna(""))
+
+answers = load_answers()
+
+@st.cache_resource
+def load_progress():
+    return ProgressEngine()
+
+progress = load_progress()
+
 # ------------------------------------------------
 # SESSION STATE
 # ------------------------------------------------
@@ -38,8 +52,20 @@ if "show_hint" not in st.session_state:
 # ------------------------------------------------
 name = st.text_input("Enter Your Name", value="Moorthy")
 
-if name:
-    st.subheader(f"🌿 Welcome {name}")
+if not name:
+    st.info("Enter your name to start the journey.")
+    st.stop()
+
+st.subheader(f"🌿 Welcome {name}")
+
+user = progress.find_user(name) or progress.register_user(name)
+USER_ID = user["user_id"]
+
+# Stored progress survives refreshes; reload it when the player changes
+if st.session_state.get("user_id") != USER_ID:
+    st.session_state.user_id = USER_ID
+    st.session_state.xp = user["total_points"]
+    st.session_state.streak = user["current_streak"]
 
 # ------------------------------------------------
 # SCOREBOARD
@@ -75,21 +101,22 @@ user_answer = st.text_input("Your Answer")
 
 if st.button("Submit Answer"):
 
-    correct_answer = riddle_data["answer"].strip().lower()
-    user_answer_clean = user_answer.strip().lower()
+    result = answers.check(riddle_data.name, user_answer)
 
-    if user_answer_clean == correct_answer:
+    if result["correct"]:
         st.success("✅ Correct! Well done.")
 
-        st.session_state.xp += int(riddle_data["points"])
-        st.session_state.streak += 1
+        user = progress.record_answer(USER_ID, True, result["points"])
+        st.session_state.xp = user["total_points"]
+        st.session_state.streak = user["current_streak"]
 
         # Load new riddle
         st.session_state.current_riddle = df.sample(1).iloc[0]
         st.session_state.show_hint = False
 
     else:
-        st.error(f"❌ Incorrect! The correct answer was: {riddle_data['landmark']}")
+        st.error(f"❌ Incorrect! The correct answer was: {riddle_data['answer']}")
+        progress.record_answer(USER_ID, False, 0)
         st.session_state.streak = 0
 
 st.divider()
@@ -106,13 +133,6 @@ if st.button("🎮 Skip Riddle"):
 # ------------------------------------------------
 st.divider()
 
-if st.session_state.xp < 50:
-    level = "Seeker"
-elif st.session_state.xp < 150:
-    level = "Explorer"
-elif st.session_state.xp < 300:
-    level = "Pilgrim"
-else:
-    level = "Spiritual Master"
+level = title_for_points(st.session_state.xp)
 
 st.subheader(f"🏆 Title: {level}")
\ No newline at end of file
@@ -0,0 +1,105 @@
+import os
+import threading
+from collections import OrderedDict
+
+import metrics
+
+# Precision 6 cells are about 1.2 x 0.6 km; 5 is about 4.9 x 4.9 km
+GEO_CACHE_PRECISION = int(os.environ.get("GEO_CACHE_PRECISION", "6"))
+GEO_CACHE_SIZE = int(os.environ.get("GEO_CACHE_SIZE", "10000"))
+
+_BASE32 = "0123456789bcdefghjkmnpqrstuvwxyz"
+_DECODE = {c: i for i, c in enumerate(_BASE32)}
+
+
+# -------- GEOHASH --------
+def encode(lat, lon, precision=GEO_CACHE_PRECISION):
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    value = 0
+    even = True
+    while len(chars) < precision:
+        rng, coord = (lon_range, lon) if even else (lat_range, lat)
+        mid = (rng[0] + rng[1]) / 2
+        value <<= 1
+        if coord >= mid:
+            value |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bits += 1
+        if bits == 5:
+            chars.append(_BASE32[value])
+            bits = value = 0
+    return "".join(chars)
+
+
+def decode_center(geohash):
+    """
+    (lat, lon) of the centre of a geohash cell.
+    """
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    even = True
+    for ch in geohash:
+        value = _DECODE[ch]
+        for shift in range(4, -1, -1):
+            rng = lon_range if even else lat_range
+            mid = (rng[0] + rng[1]) / 2
+            if (value >> shift) & 1:
+                rng[0] = mid
+            else:
+                rng[1] = mid
+            even = not even
+    return (lat_range[0] + lat_range[1]) / 2, (lon_range[0] + lon_range[1]) / 2
+
+
+# -------- CACHE --------
+class GeoCellCache:
+    """
+    Location-based results keyed by (geohash cell, filters).
+
+    Every coordinate in a cell gets the answer computed for the cell
+    centre, so nearby users share entries. Entries are evicted least
+    recently used first, and all of them are dropped when the dataset
+    version changes.
+    """
+
+    def __init__(self, name, precision=GEO_CACHE_PRECISION, max_entries=GEO_CACHE_SIZE):
+        self.name = name
+        self.precision = precision
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, lat, lon, filters, version, compute):
+        """
+        Cached result for the cell containing (lat, lon). On a miss,
+        compute(cell, center_lat, center_lon) produces it.
+        """
+        cell = encode(lat, lon, self.precision)
+        key = (cell, filters)
+
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                metrics.cache_hit(self.name)
+                return self._entries[key]
+
+        metrics.cache_miss(self.name)
+        center_lat, center_lon = decode_center(cell)
+        result = compute(cell, center_lat, center_lon)
+
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = result
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return result
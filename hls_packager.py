@@ -0,0 +1,163 @@
+import math
+import os
+import re
+import shutil
+import threading
+
+from audio_metadata import id3v2_size, iter_frames, parse_id3v1
+
+HLS_ROOT = os.environ.get("HLS_ROOT", "audio_hls")
+SEGMENT_SECONDS = 6.0
+FIRST_SEGMENT_SECONDS = 2.0     # short first segment so playback starts fast
+PLAYLIST_NAME = "index.m3u8"
+
+DIGEST_RE = re.compile(r"^[0-9a-f]{16}$")
+SEGMENT_RE = re.compile(r"^seg\d{5}\.mp3$")
+
+_locks = {}
+_locks_guard = threading.Lock()
+
+
+def _lock_for(digest):
+    with _locks_guard:
+        return _locks.setdefault(digest, threading.Lock())
+
+
+def timestamp_tag(pts):
+    """
+    ID3v2.4 tag with the PRIV frame HLS packed audio uses to carry the
+    segment's 33-bit, 90 kHz start timestamp.
+    """
+    owner = b"com.apple.streaming.transportStreamTimestamp\x00"
+    payload = owner + (pts & 0x1FFFFFFFF).to_bytes(8, "big")
+    frame = b"PRIV" + _syncsafe(len(payload)) + b"\x00\x00" + payload
+    return b"ID3\x04\x00\x00" + _syncsafe(len(frame)) + frame
+
+
+def _syncsafe(n):
+    return bytes([(n >> 21) & 0x7F, (n >> 14) & 0x7F, (n >> 7) & 0x7F, n & 0x7F])
+
+
+# -------- PACKAGING --------
+def package(path, sha256, root=HLS_ROOT):
+    """
+    Splits an MP3 at frame boundaries into ~SEGMENT_SECONDS segments
+    and writes an HLS VOD playlist. Output goes to a directory named
+    after the file's checksum, so segments never change once written.
+    Returns the digest used in segment URLs.
+    """
+    digest = sha256[:16]
+    out_dir = os.path.join(root, digest)
+    if os.path.exists(os.path.join(out_dir, PLAYLIST_NAME)):
+        return digest
+
+    with _lock_for(digest):
+        if os.path.exists(os.path.join(out_dir, PLAYLIST_NAME)):
+            return digest
+
+        tmp_dir = out_dir + f".tmp{os.getpid()}"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+
+        durations = _write_segments(path, tmp_dir)
+        _write_playlist(tmp_dir, digest, durations)
+
+        try:
+            os.rename(tmp_dir, out_dir)
+        except OSError:
+            # Another worker finished first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    return digest
+
+
+def _write_segments(path, out_dir):
+    size = os.path.getsize(path)
+    durations = []
+
+    with open(path, "rb") as f:
+        start = id3v2_size(f.read(10))
+        end = size
+        if size >= 128:
+            f.seek(size - 128)
+            if parse_id3v1(f.read(128)):
+                end -= 128
+
+        chunk, elapsed, seg_start = [], 0.0, 0.0
+        first = True
+
+        for offset, header in iter_frames(f, start, end):
+            f.seek(offset)
+            frame = f.read(header["frame_length"])
+
+            # Xing/Info frames describe the whole file and carry no audio
+            if first:
+                first = False
+                if b"Xing" in frame[:64] or b"Info" in frame[:64]:
+                    continue
+
+            chunk.append(frame)
+            elapsed += header["samples"] / header["sample_rate"]
+
+            target = FIRST_SEGMENT_SECONDS if not durations else SEGMENT_SECONDS
+            if elapsed - seg_start >= target:
+                durations.append(_flush(out_dir, len(durations), chunk, seg_start, elapsed))
+                chunk, seg_start = [], elapsed
+
+        if chunk:
+            durations.append(_flush(out_dir, len(durations), chunk, seg_start, elapsed))
+
+    return durations
+
+
+def _flush(out_dir, index, frames, start, end):
+    pts = int(round(start * 90000))
+    with open(os.path.join(out_dir, f"seg{index:05d}.mp3"), "wb") as f:
+        f.write(timestamp_tag(pts))
+        f.write(b"".join(frames))
+    return end - start
+
+
+def _write_playlist(out_dir, digest, durations):
+    lines = [
+        "#EXTM3U",
+        "#EXT-X-VERSION:3",
+        f"#EXT-X-TARGETDURATION:{math.ceil(max(durations, default=SEGMENT_SECONDS))}",
+        "#EXT-X-MEDIA-SEQUENCE:0",
+        "#EXT-X-PLAYLIST-TYPE:VOD",
+        "#EXT-X-INDEPENDENT-SEGMENTS",
+    ]
+    for i, duration in enumerate(durations):
+        lines.append(f"#EXTINF:{duration:.3f},")
+        lines.append(f"/music/hls/segments/{digest}/seg{i:05d}.mp3")
+    lines.append("#EXT-X-ENDLIST")
+
+    with open(os.path.join(out_dir, PLAYLIST_NAME), "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+# -------- LOOKUP --------
+def playlist_path(digest, root=HLS_ROOT):
+    return os.path.join(root, digest, PLAYLIST_NAME)
+
+
+def segment_path(digest, segment, root=HLS_ROOT):
+    """
+    Path of a packaged segment, or None for malformed names.
+    """
+    if not DIGEST_RE.match(digest) or not SEGMENT_RE.match(segment):
+        return None
+    return os.path.join(root, digest, segment)
+
+
+# -------- Example Usage --------
+if __name__ == "__main__":
+    from music_backend import load_library, get_audio_path
+    from audio_metadata import MetadataIndex
+
+    index = MetadataIndex()
+    for religion, songs in load_library().items():
+        for song in songs:
+            path = get_audio_path(religion, song)
+            digest = package(path, index.get(path)["sha256"])
+            print(f"{religion}/{song} -> {playlist_path(digest)}")
@@ -0,0 +1,272 @@
+"""
+Out-of-process inference server shared by all API workers on a host.
+
+    python inference_sidecar.py [--socket /tmp/religious-inference.sock]
+
+The server owns the llama.cpp and NLLB models; API workers started with
+INFERENCE_SOCKET=<path> talk to it through model_backends instead of
+loading their own copies.
+
+Wire format (all integers big-endian):
+
+    frame    = u32 length, payload
+    request  = u8 op, u8 field count, fields
+    response = u8 status (0 ok, 1 error), u8 field count, fields
+    field    = u32 length, bytes
+
+GENERATE fields: caller name, prompt, options (JSON)
+    -> text, prompt tokens (u32), completion tokens (u32), finish reason
+TRANSLATE fields: text, target language code -> translated text
+TRANSLATE_MANY fields: text, code, code, ... -> one translation per code
+PING: no fields -> no fields
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+OP_PING = 0
+OP_GENERATE = 1
+OP_TRANSLATE = 2
+OP_TRANSLATE_MANY = 3
+
+STATUS_OK = 0
+STATUS_ERROR = 1
+
+DEFAULT_SOCKET = "/tmp/religious-inference.sock"
+MAX_FRAME = 16 * 1024 * 1024
+
+# The socket only appears once the server has loaded its models, so
+# clients started alongside it wait this long for it on load().
+CONNECT_TIMEOUT = float(os.environ.get("INFERENCE_CONNECT_TIMEOUT", "120"))
+
+_U32 = struct.Struct(">I")
+
+
+class SidecarError(RuntimeError):
+    pass
+
+
+# -------- FRAMING --------
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            raise ConnectionError("inference socket closed")
+        buf.extend(chunk)
+    return bytes(buf)
+
+
+def send_message(sock, code, fields):
+    parts = [bytes((code, len(fields)))]
+    for field in fields:
+        if isinstance(field, str):
+            field = field.encode("utf-8")
+        parts.append(_U32.pack(len(field)))
+        parts.append(field)
+    payload = b"".join(parts)
+    sock.sendall(_U32.pack(len(payload)) + payload)
+
+
+def recv_message(sock):
+    (length,) = _U32.unpack(_recv_exact(sock, 4))
+    if length > MAX_FRAME:
+        raise SidecarError(f"frame of {length} bytes exceeds limit")
+    payload = _recv_exact(sock, length)
+
+    code, count = payload[0], payload[1]
+    fields, pos = [], 2
+    for _ in range(count):
+        (size,) = _U32.unpack_from(payload, pos)
+        pos += 4
+        fields.append(payload[pos:pos + size])
+        pos += size
+    return code, fields
+
+
+# -------- SERVER --------
+class _Handler(socketserver.BaseRequestHandler):
+    def handle(self):
+        while True:
+            try:
+                op, fields = recv_message(self.request)
+            except (ConnectionError, OSError):
+                return
+
+            try:
+                reply = self.server.dispatch(op, fields)
+                send_message(self.request, STATUS_OK, reply)
+            except Exception as e:
+                send_message(self.request, STATUS_ERROR, [f"{type(e).__name__}: {e}"])
+
+
+class InferenceServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+    def __init__(self, socket_path, generators, translator):
+        self.generators = generators
+        self.translator = translator
+        if os.path.exists(socket_path):
+            os.unlink(socket_path)
+        super().__init__(socket_path, _Handler)
+        os.chmod(socket_path, 0o660)
+
+    def dispatch(self, op, fields):
+        if op == OP_PING:
+            return []
+
+        if op == OP_GENERATE:
+            name, prompt, options = (f.decode("utf-8") for f in fields)
+            output = self.generators[name](prompt, **json.loads(options))
+            choice = output["choices"][0]
+            usage = output.get("usage") or {}
+            return [
+                choice["text"],
+                _U32.pack(usage.get("prompt_tokens", 0)),
+                _U32.pack(usage.get("completion_tokens", 0)),
+                choice.get("finish_reason") or "",
+            ]
+
+        if op == OP_TRANSLATE:
+            text, lang_code = (f.decode("utf-8") for f in fields)
+            return [self.translator.translate(text, lang_code)]
+
+        if op == OP_TRANSLATE_MANY:
+            text, *lang_codes = (f.decode("utf-8") for f in fields)
+            translations = self.translator.translate_many(text, lang_codes)
+            return [translations[code] for code in lang_codes]
+
+        raise SidecarError(f"unknown op {op}")
+
+
+# -------- CLIENT --------
+class _Connection:
+    """
+    One persistent socket per client thread.
+    """
+
+    def __init__(self, socket_path):
+        self.socket_path = socket_path
+        self._local = threading.local()
+
+    def _sock(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.connect(self.socket_path)
+            self._local.sock = sock
+        return sock
+
+    def call(self, op, fields):
+        for attempt in (1, 2):
+            try:
+                sock = self._sock()
+                send_message(sock, op, fields)
+                status, reply = recv_message(sock)
+                break
+            except (ConnectionError, OSError):
+                self.reset()
+                if attempt == 2:
+                    raise
+        if status != STATUS_OK:
+            raise SidecarError(reply[0].decode("utf-8") if reply else "inference error")
+        return reply
+
+    def wait_ready(self, timeout=CONNECT_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self.call(OP_PING, [])
+            except (ConnectionError, OSError):
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.5)
+
+    def reset(self):
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+
+class SidecarGenerator:
+    """
+    Generation backend that forwards to the inference server.
+    Returns the same completion dict shape as llama_cpp.
+    """
+
+    def __init__(self, name, socket_path=DEFAULT_SOCKET):
+        self.name = name
+        self._conn = _Connection(socket_path)
+
+    def load(self):
+        self._conn.wait_ready()
+        return self
+
+    def __call__(self, prompt, **kwargs):
+        text, prompt_tokens, completion_tokens, finish = self._conn.call(
+            OP_GENERATE, [self.name, prompt, json.dumps(kwargs)]
+        )
+        prompt_tokens = _U32.unpack(prompt_tokens)[0]
+        completion_tokens = _U32.unpack(completion_tokens)[0]
+        return {
+            "choices": [{"text": text.decode("utf-8"), "finish_reason": finish.decode("utf-8") or None}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+class SidecarTranslator:
+    def __init__(self, socket_path=DEFAULT_SOCKET):
+        self._conn = _Connection(socket_path)
+
+    def load(self):
+        self._conn.wait_ready()
+        return self
+
+    def translate(self, text, lang_code):
+        (translated,) = self._conn.call(OP_TRANSLATE, [text, lang_code])
+        return translated.decode("utf-8")
+
+    def translate_many(self, text, lang_codes):
+        reply = self._conn.call(OP_TRANSLATE_MANY, [text, *lang_codes])
+        return {code: t.decode("utf-8") for code, t in zip(lang_codes, reply)}
+
+
+# -------- Example Usage --------
+if __name__ == "__main__":
+    import model_backends
+
+    parser = argparse.ArgumentParser(description="Inference sidecar for the API workers")
+    parser.add_argument("--socket", default=os.environ.get("INFERENCE_SOCKET", DEFAULT_SOCKET))
+    parser.add_argument("--no-warmup", action="store_true", help="load models on first request")
+    args = parser.parse_args()
+
+    # Every caller uses the same GGUF, so the sidecar loads it once
+    llm = model_backends.LlamaGenerator(
+        model_backends.GGUF_MODEL_PATH, **model_backends.shared_llama_settings()
+    )
+    generators = {name: llm for name in model_backends.LLAMA_SETTINGS}
+    translator = model_backends.local_translator()
+
+    if not args.no_warmup:
+        for backend in generators.values():
+            backend.load()
+        translator.load()
+
+    server = InferenceServer(args.socket, generators, translator)
+    print(f"Inference sidecar listening on {args.socket}")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
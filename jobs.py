@@ -0,0 +1,245 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import metrics
+
+DB_PATH = os.environ.get("JOBS_DB", "jobs.db")
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", "2"))
+JOB_TTL = float(os.environ.get("JOB_TTL", str(24 * 3600)))   # kept after creation
+PURGE_INTERVAL = 300
+
+QUEUED, RUNNING, DONE, FAILED = "queued", "running", "done", "failed"
+FINISHED = (DONE, FAILED)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    kind TEXT NOT NULL,
+    params TEXT NOT NULL,
+    params_hash TEXT,
+    idempotency_key TEXT,
+    status TEXT NOT NULL,
+    result TEXT,
+    error TEXT,
+    owner INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    expires_at REAL NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS jobs_idempotency ON jobs (kind, idempotency_key);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS jobs_expires ON jobs (expires_at);
+"""
+
+
+class IdempotencyConflict(ValueError):
+    """
+    An idempotency key was reused with different params.
+    """
+
+
+def params_hash(params):
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# -------- STORE --------
+class JobStore:
+    """
+    Jobs and their results in SQLite (WAL), shared by all workers on
+    the host. Rows expire JOB_TTL seconds after creation.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+        self._next_purge = 0.0
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(jobs)")}
+        if "params_hash" not in columns:
+            conn.execute("ALTER TABLE jobs ADD COLUMN params_hash TEXT")
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def create(self, kind, params, idempotency_key=None):
+        """
+        Inserts a queued job. With an idempotency key, an unexpired job
+        of the same kind and key is returned instead, or IdempotencyConflict
+        raised if its params differ. Returns (job, created).
+        """
+        conn = self._conn()
+        now = time.time()
+        self._maybe_purge(now)
+        digest = params_hash(params)
+
+        if idempotency_key:
+            existing = conn.execute(
+                "SELECT * FROM jobs WHERE kind = ? AND idempotency_key = ? AND expires_at > ?",
+                (kind, idempotency_key, now),
+            ).fetchone()
+            if existing:
+                # Rows from before params were hashed match any params
+                if existing["params_hash"] not in (None, digest):
+                    raise IdempotencyConflict(
+                        f"idempotency key {idempotency_key!r} was used with different params"
+                    )
+                return self._as_dict(existing), False
+
+        job_id = uuid.uuid4().hex
+        try:
+            conn.execute(
+                "INSERT INTO jobs (id, kind, params, params_hash, idempotency_key, status, created_at, updated_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (job_id, kind, json.dumps(params), digest, idempotency_key, QUEUED, now, now, now + JOB_TTL),
+            )
+        except sqlite3.IntegrityError:
+            # Another worker created it first, or an expired row still
+            # holds the key
+            conn.execute(
+                "DELETE FROM jobs WHERE kind = ? AND idempotency_key = ? AND expires_at <= ?",
+                (kind, idempotency_key, now),
+            )
+            return self.create(kind, params, idempotency_key)
+        return self.get(job_id), True
+
+    def get(self, job_id):
+        row = self._conn().execute(
+            "SELECT * FROM jobs WHERE id = ? AND expires_at > ?", (job_id, time.time())
+        ).fetchone()
+        return self._as_dict(row) if row else None
+
+    def claim(self, job_id):
+        """
+        Marks a queued job as running in this process. False if another
+        worker already claimed it.
+        """
+        cur = self._conn().execute(
+            "UPDATE jobs SET status = ?, owner = ?, updated_at = ? WHERE id = ? AND status = ?",
+            (RUNNING, os.getpid(), time.time(), job_id, QUEUED),
+        )
+        return cur.rowcount == 1
+
+    def finish(self, job_id, result=None, error=None):
+        self._conn().execute(
+            "UPDATE jobs SET status = ?, result = ?, error = ?, updated_at = ? WHERE id = ?",
+            (
+                FAILED if error else DONE,
+                None if error else json.dumps(result),
+                error,
+                time.time(),
+                job_id,
+            ),
+        )
+
+    def orphaned(self):
+        """
+        Ids of queued jobs plus running jobs whose worker process died,
+        reset to queued so they can be claimed again.
+        """
+        conn = self._conn()
+        now = time.time()
+        for row in conn.execute(
+            "SELECT id, owner FROM jobs WHERE status = ? AND expires_at > ?", (RUNNING, now)
+        ).fetchall():
+            if not row["owner"] or not _pid_alive(row["owner"]):
+                conn.execute(
+                    "UPDATE jobs SET status = ?, owner = NULL WHERE id = ? AND status = ?",
+                    (QUEUED, row["id"], RUNNING),
+                )
+        rows = conn.execute(
+            "SELECT id FROM jobs WHERE status = ? AND expires_at > ? ORDER BY created_at", (QUEUED, now)
+        ).fetchall()
+        return [r["id"] for r in rows]
+
+    def _maybe_purge(self, now):
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL
+            self._conn().execute("DELETE FROM jobs WHERE expires_at <= ?", (now,))
+
+    @staticmethod
+    def _as_dict(row):
+        job = {
+            "job_id": row["id"],
+            "kind": row["kind"],
+            "status": row["status"],
+            "params": json.loads(row["params"]),
+            "created_at": row["created_at"],
+            "updated_at": row["updated_at"],
+            "expires_at": row["expires_at"],
+        }
+        if row["status"] == DONE:
+            job["result"] = json.loads(row["result"])
+        if row["status"] == FAILED:
+            job["error"] = row["error"]
+        return job
+
+
+# -------- RUNNER --------
+class JobRunner:
+    """
+    Runs jobs on a small thread pool, independent of the request that
+    created them, so a dropped connection does not cancel the work.
+    `handlers` maps a job kind to a function taking the job params.
+    """
+
+    def __init__(self, store, handlers, workers=JOB_WORKERS):
+        self.store = store
+        self.handlers = handlers
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="job")
+
+    def submit(self, kind, params, idempotency_key=None):
+        job, created = self.store.create(kind, params, idempotency_key)
+        if created:
+            metrics.JOBS.inc(kind=kind, status=QUEUED)
+            self._pool.submit(self._run, job["job_id"])
+        return job
+
+    def resume(self):
+        """
+        Picks up jobs left queued or running by a stopped worker.
+        """
+        for job_id in self.store.orphaned():
+            self._pool.submit(self._run, job_id)
+
+    def _run(self, job_id):
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+        if job is None:
+            return
+
+        try:
+            result = self.handlers[job["kind"]](job["params"])
+        except Exception as e:
+            self.store.finish(job_id, error=f"{type(e).__name__}: {e}")
+            metrics.JOBS.inc(kind=job["kind"], status=FAILED)
+            return
+        self.store.finish(job_id, result=result)
+        metrics.JOBS.inc(kind=job["kind"], status=DONE)
+
+    def close(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,113 @@
+import threading
+
+from sortedcontainers import SortedList
+
+SCOPES = ("global", "state", "religion")
+
+
+def _rank_key(user):
+    # Highest points first, earliest user id breaks ties
+    return (-int(user["total_points"]), int(user["user_id"]))
+
+
+class Leaderboards:
+    """
+    Top-N lists per partition (global, each state, each religion).
+
+    Every partition is a SortedList of (-points, user_id) keys, so a
+    point update is two O(log n) operations per partition and top-k or
+    rank lookups never sort the user table.
+    """
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._lock = threading.Lock()
+        self._users = {}
+        self._parts = {}
+
+        self._last_activity_id = engine.last_activity_id()
+        for user in engine.all_users():
+            self._apply(user)
+
+    def _partitions(self, user):
+        yield ("global", "")
+        if user.get("state"):
+            yield ("state", user["state"])
+        if user.get("religion"):
+            yield ("religion", user["religion"])
+
+    def _apply(self, user):
+        old = self._users.get(user["user_id"])
+        if old is not None:
+            old_key = _rank_key(old)
+            for part in self._partitions(old):
+                self._parts[part].discard(old_key)
+
+        key = _rank_key(user)
+        for part in self._partitions(user):
+            self._parts.setdefault(part, SortedList()).add(key)
+        self._users[user["user_id"]] = user
+
+    def update(self, user):
+        """
+        Applies one changed user row (as returned by the progress engine).
+        """
+        with self._lock:
+            self._apply(user)
+
+    def sync(self):
+        """
+        Pulls users changed since the last sync, including writes from
+        other worker processes.
+        """
+        last_id, users = self.engine.changed_users(self._last_activity_id)
+        if not users and last_id == self._last_activity_id:
+            return
+
+        with self._lock:
+            # A concurrent sync may already have applied a newer batch;
+            # applying this one would overwrite users with stale rows
+            if last_id <= self._last_activity_id:
+                return
+            for user in users:
+                self._apply(user)
+            self._last_activity_id = last_id
+
+    def _entry(self, rank, user_id):
+        user = self._users[user_id]
+        return {
+            "rank": rank,
+            "user_id": user_id,
+            "name": user["name"],
+            "total_points": user["total_points"],
+            "title": user["title"],
+        }
+
+    def top(self, scope="global", value="", k=10):
+        with self._lock:
+            part = self._parts.get((scope, value if scope != "global" else ""))
+            if not part:
+                return []
+            return [
+                self._entry(rank, user_id)
+                for rank, (_, user_id) in enumerate(part.islice(0, k), 1)
+            ]
+
+    def rank(self, user_id, scope="global"):
+        """
+        Returns the user's entry within their own partition for scope,
+        or None for an unknown user.
+        """
+        with self._lock:
+            user = self._users.get(user_id)
+            if user is None:
+                return None
+
+            value = "" if scope == "global" else user.get(scope, "")
+            part = self._parts.get((scope, value))
+            if not part:
+                return None
+
+            entry = self._entry(part.index(_rank_key(user)) + 1, user_id)
+            entry["of"] = len(part)
+            return entry
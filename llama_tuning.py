@@ -0,0 +1,169 @@
+"""
+Finds the fastest llama.cpp runtime settings for this host.
+
+    python llama_tuning.py [--threads 2,4,8] [--batch 8,64,256,512] [--ctx 1024,2048]
+
+Each combination is loaded and timed on a fixed prompt: prefill
+throughput from a 1-token completion, decode throughput from a longer
+one. The combination with the lowest estimated latency for a typical
+request (PROMPT_TOKENS in, DECODE_TOKENS out) is written to
+model_backends.LLAMA_PROFILE, which both model loaders read.
+"""
+
+import argparse
+import json
+import os
+import platform
+import time
+from datetime import datetime
+
+from model_backends import GGUF_MODEL_PATH, LLAMA_PROFILE
+
+# Shape of a typical request: a Pathway prompt and an early-stopped answer
+PROMPT_TOKENS = 180
+DECODE_TOKENS = 120
+
+# Pathway prompts plus their answer need about 800 tokens of context
+MIN_CTX = 1024
+
+BENCH_PROMPT = (
+    "You are a traditional spiritual master.\n"
+    "Create a structured spiritual roadmap for attaining the highest spiritual goal "
+    "in Hinduism, based strictly on teachings from Bhagavad Gita.\n\n"
+    "The roadmap must:\n"
+    "- Contain 6 to 8 numbered steps.\n"
+    "- Show spiritual progression from beginner to advanced level.\n"
+    "- Include real concepts, practices, or doctrines from Bhagavad Gita.\n"
+    "- End with the final spiritual realization (moksha, enlightenment, salvation, "
+    "or divine union depending on the tradition).\n\n"
+    "Start from foundational discipline and move toward ultimate realization.\n"
+    "Number each step clearly from 1.\n"
+    "Do not give general moral advice. Focus on spiritual advancement.\n\nAnswer:"
+)
+
+
+def available_cpus():
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def thread_candidates(cpus):
+    """
+    Powers of two up to the CPU count, plus half and all of the CPUs
+    (half is usually the physical core count with SMT).
+    """
+    candidates = {cpus, max(1, cpus // 2)}
+    n = 1
+    while n < cpus:
+        candidates.add(n)
+        n *= 2
+    return sorted(candidates)
+
+
+def _parse_ints(value):
+    return [int(v) for v in value.split(",") if v.strip()]
+
+
+# -------- MEASUREMENT --------
+def measure(model_path, settings, repeats=2):
+    """
+    Prefill and decode throughput (tokens/s) of one settings combination,
+    best of `repeats`.
+    """
+    from llama_cpp import Llama
+
+    llm = Llama(model_path=model_path, verbose=False, **settings)
+    prefill_tps = decode_tps = 0.0
+    for _ in range(repeats):
+        # reset() drops the KV cache so the prompt is evaluated again
+        llm.reset()
+        start = time.perf_counter()
+        first = llm(BENCH_PROMPT, max_tokens=1, temperature=0)
+        prefill = time.perf_counter() - start
+        prefill_tps = max(prefill_tps, first["usage"]["prompt_tokens"] / prefill)
+
+        llm.reset()
+        start = time.perf_counter()
+        full = llm(BENCH_PROMPT, max_tokens=DECODE_TOKENS, temperature=0)
+        decode = time.perf_counter() - start - prefill
+        decoded = full["usage"]["completion_tokens"] - 1
+        if decoded > 0 and decode > 0:
+            decode_tps = max(decode_tps, decoded / decode)
+    return prefill_tps, decode_tps
+
+
+def estimated_latency(prefill_tps, decode_tps):
+    if not prefill_tps or not decode_tps:
+        return float("inf")
+    return PROMPT_TOKENS / prefill_tps + DECODE_TOKENS / decode_tps
+
+
+def tune(model_path, threads, batches, contexts, repeats=2, gpu_layers=0):
+    results = []
+    for n_ctx in contexts:
+        for n_batch in batches:
+            for n_threads in threads:
+                settings = {
+                    "n_threads": n_threads,
+                    "n_batch": n_batch,
+                    "n_ctx": n_ctx,
+                    "n_gpu_layers": gpu_layers,
+                }
+                prefill_tps, decode_tps = measure(model_path, settings, repeats)
+                latency = estimated_latency(prefill_tps, decode_tps)
+                results.append({
+                    "settings": settings,
+                    "prefill_tps": round(prefill_tps, 2),
+                    "decode_tps": round(decode_tps, 2),
+                    "estimated_latency_s": round(latency, 3),
+                })
+                print(
+                    f"threads={n_threads:<3} batch={n_batch:<4} ctx={n_ctx:<5} "
+                    f"prefill={prefill_tps:8.1f} tok/s  decode={decode_tps:6.1f} tok/s  "
+                    f"est={latency:.3f}s"
+                )
+    results.sort(key=lambda r: r["estimated_latency_s"])
+    return results
+
+
+def save_profile(results, path=LLAMA_PROFILE, model_path=GGUF_MODEL_PATH):
+    best = results[0]
+    payload = {
+        "host": platform.node(),
+        "cpus": available_cpus(),
+        "model": os.path.basename(model_path),
+        "tuned_at": datetime.now().isoformat(timespec="seconds"),
+        "settings": best["settings"],
+        "results": results,
+    }
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    os.replace(tmp, path)
+    return best
+
+
+# -------- Example Usage --------
+if __name__ == "__main__":
+    cpus = available_cpus()
+    parser = argparse.ArgumentParser(description="Tune llama.cpp settings for this host")
+    parser.add_argument("--model", default=GGUF_MODEL_PATH)
+    parser.add_argument("--threads", type=_parse_ints, default=thread_candidates(cpus))
+    parser.add_argument("--batch", type=_parse_ints, default=[8, 64, 256, 512])
+    parser.add_argument("--ctx", type=_parse_ints, default=[MIN_CTX, 2048])
+    parser.add_argument("--gpu-layers", type=int, default=0, help="layers to offload when a GPU build is used")
+    parser.add_argument("--repeats", type=int, default=2)
+    parser.add_argument("--output", default=LLAMA_PROFILE)
+    parser.add_argument("--dry-run", action="store_true", help="print results without saving")
+    args = parser.parse_args()
+
+    contexts = [c for c in args.ctx if c >= MIN_CTX] or [MIN_CTX]
+    print(f"Tuning {args.model} on {cpus} CPUs")
+    results = tune(args.model, args.threads, args.batch, contexts, args.repeats, args.gpu_layers)
+
+    if args.dry_run:
+        print(f"Best: {results[0]['settings']}")
+    else:
+        best = save_profile(results, args.output, args.model)
+        print(f"Best: {best['settings']} -> {args.output}")
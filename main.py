@@ -1,19 +1,54 @@
-from fastapi import FastAPI, Query
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import FastAPI, Query, HTTPException, Request, Header, Body
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, FileResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel
 from enum import Enum
-from typing import Optional, List
+from typing import Optional, List, Literal, Union, Annotated
 import pandas as pd
 import random
 import math
 import os
+import time
+import json
+import asyncio
+from collections import Counter
 
 # ==========================================
 # IMPORT AI MODULES
 # ==========================================
-import Interfaith_and__faith_based as philosopher
-import ai_features as wisdom
-
-app = FastAPI(title="Religious AI Unified Backend", version="2.0")
+import philosopher_engine as philosopher
+import wisdom_engine as wisdom
+import metrics
+import tracing
+import profiling
+import music_backend
+import media_responses
+import audio_metadata
+import hls_packager
+import riddle_engine
+import progress_engine
+import leaderboard
+import jobs
+import answer_cache
+import shared_cache
+import snapshots
+import geo_cache
+import trip_planner
+import static_responses
+from singleflight import SingleFlight
+from activity_writer import ActivityLogWriter
+
+class TimedJSONResponse(JSONResponse):
+    def render(self, content):
+        with tracing.span("serialize"):
+            return super().render(content)
+
+app = FastAPI(
+    title="Religious AI Unified Backend",
+    version="2.0",
+    default_response_class=TimedJSONResponse
+)
 
 # ==================================================
 # LOAD DATASETS SAFELY
@@ -28,10 +63,92 @@ def load_csv_safe(path):
     except:
         return pd.DataFrame()
 
-landmarks_df = load_csv_safe("india_religious_landmarks_phase1.csv")
+landmarks = snapshots.CsvSnapshot("india_religious_landmarks_phase1_full.csv", load_csv_safe)
 food_df = load_csv_safe("food_dataset.csv")
 riddles_df = load_csv_safe("realistic_spiritual_riddles.csv")
 
+riddle_answers = riddle_engine.load_answer_table(riddles_df)
+
+metrics.DATASET_ROWS.set_function(lambda: len(landmarks.df), dataset="landmarks")
+metrics.DATASET_ROWS.set_function(lambda: len(food_df), dataset="food")
+metrics.DATASET_ROWS.set_function(lambda: len(riddles_df), dataset="riddles")
+metrics.DATASET_ROWS.set_function(
+    lambda: sum(len(s) for s in music_backend.load_library().values()), dataset="music_tracks"
+)
+
+progress = progress_engine.ProgressEngine()
+leaderboards = leaderboard.Leaderboards(progress)
+
+activity_log = ActivityLogWriter().start()
+
+@app.on_event("shutdown")
+def close_activity_log():
+    activity_log.close()
+
+# ==================================================
+# METRICS
+# ==================================================
+
+@app.middleware("http")
+async def observe_request(request: Request, call_next):
+    metrics.REQUESTS_IN_FLIGHT.inc()
+    trace = tracing.start(request.method, request.url.path)
+    profile = profiling.profile_request(request.scope) if profiling.should_profile(request) else None
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        metrics.REQUESTS_IN_FLIGHT.dec()
+        route = request.scope.get("route")
+        route_path = route.path if route else "unmatched"
+        metrics.REQUEST_LATENCY.observe(
+            time.perf_counter() - start,
+            method=request.method,
+            route=route_path,
+            status=status
+        )
+
+        trace.finish(status, route_path)
+        if status != 500:
+            response.headers["Server-Timing"] = trace.server_timing()
+        tracing.record(trace, force=request.query_params.get("debug") == "true")
+
+        if profile is not None:
+            await run_in_threadpool(profile.finish, route_path)
+
+@app.get("/metrics")
+def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def require_admin(token):
+    if not profiling.is_admin(token):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+@app.get("/admin/profiles")
+def list_profiles(x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    return {"profiles": profiling.list_profiles()}
+
+@app.get("/admin/profiles/{route}/{name}")
+def download_profile(route: str, name: str, x_admin_token: Optional[str] = Header(None)):
+    require_admin(x_admin_token)
+    path = profiling.profile_path(route, name)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return FileResponse(path, media_type="text/plain", filename=name)
+
+@app.get("/debug/traces")
+def get_traces(
+    limit: int = Query(50, ge=1, le=500),
+    route: Optional[str] = None,
+    x_admin_token: Optional[str] = Header(None),
+):
+    require_admin(x_admin_token)
+    return {"traces": tracing.recent(limit, route)}
+
 # ==================================================
 # ENUMS (Dropdowns)
 # ==================================================
@@ -67,6 +184,11 @@ class ActivityEnum(str, Enum):
     Moderate = "Moderate"
     Active = "Active"
 
+class LeaderboardScopeEnum(str, Enum):
+    Global = "global"
+    State = "state"
+    Religion = "religion"
+
 class PhilosopherModeEnum(str, Enum):
     Single = "Single Belief Answer"
     Multi = "Multi Belief Answer"
@@ -82,6 +204,23 @@ class LanguageEnum(str, Enum):
     Tamil = "Tamil"
     Hindi = "Hindi"
     Malayalam = "Malayalam"
+    Telugu = "Telugu"
+    Kannada = "Kannada"
+    Bengali = "Bengali"
+    Gujarati = "Gujarati"
+    Marathi = "Marathi"
+    Punjabi = "Punjabi"
+    Urdu = "Urdu"
+
+# ReligionEnum values -> BELIEFS keys used by the AI modules
+BELIEF_NAMES = {
+    "Hindu": "Hinduism",
+    "Muslim": "Islam",
+    "Christian": "Christianity",
+    "Sikh": "Sikhism",
+    "Buddhist": "Buddhism",
+    "Jain": "Jainism",
+}
 
 # ==================================================
 # SAFE JSON CLEANER
@@ -101,11 +240,14 @@ def clean_records(records):
 # 🧘 AI PHILOSOPHER
 # ==================================================
 
+philosopher_answers = answer_cache.SemanticAnswerCache()
+
 @app.get("/ask_philosopher")
 def ask_philosopher(
     question: str,
     mode: PhilosopherModeEnum = PhilosopherModeEnum.Single,
-    beliefs: Optional[List[ReligionEnum]] = Query(None)
+    beliefs: Optional[List[ReligionEnum]] = Query(None),
+    debug: bool = False
 ):
     if not beliefs:
         beliefs = [ReligionEnum.Hindu]
@@ -116,93 +258,269 @@ def ask_philosopher(
         if belief.value == "All":
             continue
 
-        book = random.choice(philosopher.BELIEFS.get(belief.value, []))
-        prompt = philosopher.build_prompt(belief.value, book, question)
-        ans = philosopher.generate(prompt)
+        belief_name = BELIEF_NAMES.get(belief.value, belief.value)
+        books = philosopher.BELIEFS.get(belief_name)
+        if not books:
+            results.append({"belief": belief.value, "message": "No books available"})
+            continue
+
+        with tracing.span("cache"):
+            cached = philosopher_answers.get(belief_name, books, question)
+
+        if cached:
+            book, ans = cached
+        else:
+            book = random.choice(books)
+            with tracing.span("prompt"):
+                prompt = philosopher.build_prompt(belief_name, book, question)
+            ans = philosopher.generate(prompt)
+            philosopher_answers.put(belief_name, book, question, ans)
 
         results.append({
             "belief": belief.value,
             "book": book,
-            "answer": ans
+            "answer": ans,
+            "cached": cached is not None
         })
 
-    return {"question": question, "results": results}
+    response = {"question": question, "results": results}
+    if debug:
+        response["timings"] = tracing.current().as_dict()["stages"]
+    return response
 
 # ==================================================
 # 📜 DAILY WISDOM
 # ==================================================
 
-@app.get("/daily_wisdom")
-def daily_wisdom(
-    religion: ReligionEnum,
-    content_type: ContentTypeEnum = ContentTypeEnum.Quote,
-    language: LanguageEnum = LanguageEnum.English
-):
-    book = random.choice(wisdom.BELIEFS.get(religion.value, []))
-    prompt = wisdom.build_prompt(religion.value, book, content_type.value)
+wisdom_flight = SingleFlight("daily_wisdom")
+
+def generate_wisdom(belief_name, books, content_type):
+    book = random.choice(books)
+    with tracing.span("prompt"):
+        prompt = wisdom.build_prompt(belief_name, book, content_type)
 
     max_tokens = {
         "Quote": wisdom.MAX_TOKENS_QUOTE,
         "Short Story": wisdom.MAX_TOKENS_STORY,
         "Pathway": wisdom.MAX_TOKENS_PATHWAY
-    }[content_type.value]
+    }[content_type]
 
-    english_result = wisdom.generate_content(prompt, max_tokens, content_type.value)
-    translated_result = wisdom.translate_text(english_result, language.value)
+    return {"book": book, "english": wisdom.generate_content(prompt, max_tokens, content_type)}
 
-    return {
+def make_daily_wisdom(belief_name, books, content_type, languages):
+    # Shared by all workers on the host for CONTENT_CACHE_TTL seconds
+    content = shared_cache.get_cache().get_or_add(
+        f"wisdom:{belief_name}:{content_type}",
+        shared_cache.CONTENT_TTL,
+        lambda: generate_wisdom(belief_name, books, content_type),
+        name="wisdom_content"
+    )
+    translations = wisdom.translate_many(content["english"], languages)
+    return content["book"], content["english"], translations
+
+@app.get("/daily_wisdom")
+def daily_wisdom(
+    religion: ReligionEnum,
+    content_type: ContentTypeEnum = ContentTypeEnum.Quote,
+    language: LanguageEnum = LanguageEnum.English,
+    languages: Optional[List[LanguageEnum]] = Query(None),
+    debug: bool = False
+):
+    belief_name = BELIEF_NAMES.get(religion.value, religion.value)
+    books = wisdom.BELIEFS.get(belief_name)
+    if not books:
+        return {"message": "No books available for this religion"}
+
+    # languages=Tamil&languages=Hindi returns every translation at once
+    targets = tuple(dict.fromkeys(l.value for l in languages)) if languages else (language.value,)
+
+    # Identical concurrent requests (e.g. after a push notification)
+    # share one generation and translation run
+    book, english_result, translations = wisdom_flight.do(
+        (belief_name, content_type.value, targets),
+        make_daily_wisdom, belief_name, books, content_type.value, targets
+    )
+
+    response = {
         "religion": religion.value,
         "book": book,
-        "english": english_result,
-        "translated": translated_result
+        "english": english_result
     }
+    if languages:
+        response["translations"] = translations
+    else:
+        response["translated"] = translations[language.value]
+    if debug:
+        response["timings"] = tracing.current().as_dict()["stages"]
+    return response
 
 # ==================================================
 # 🎵 DEVOTIONAL MUSIC
 # ==================================================
 
+audio_index = audio_metadata.MetadataIndex()
+
+def song_tracks(religion):
+    tracks = []
+    for song in music_backend.get_songs_by_religion(religion):
+        meta = audio_index.get(music_backend.get_audio_path(religion, song))
+        tracks.append({"song_name": song, **{k: v for k, v in meta.items() if k != "mtime_ns"}})
+    return tracks
+
+music_bodies = static_responses.SnapshotResponses("music_responses")
+
 @app.get("/music/list_religions")
-def list_religions():
-    library = wisdom.load_library()
-    return {"religions": list(library.keys())}
+def list_religions(request: Request):
+    body = music_bodies.get(
+        "religions",
+        music_backend.library_index.version(),
+        lambda: {"religions": list(music_backend.load_library().keys())}
+    )
+    return static_responses.respond(request, body)
+
+def song_listing(religion):
+    tracks = song_tracks(religion)
+    return {
+        "religion": religion,
+        "songs": [t["song_name"] for t in tracks],
+        "tracks": tracks
+    }
 
 @app.get("/music/list_songs")
-def list_songs(religion: ReligionEnum):
-    songs = wisdom.get_songs_by_religion(religion.value)
-    return {"religion": religion.value, "songs": songs}
+def list_songs(request: Request, religion: ReligionEnum):
+    body = music_bodies.get(
+        ("songs", religion.value),
+        music_backend.library_index.version(),
+        lambda: song_listing(religion.value)
+    )
+    return static_responses.respond(request, body)
 
 @app.get("/music/play")
-def play_song(religion: ReligionEnum, song_name: str):
-    path = wisdom.get_audio_path(religion.value, song_name)
+def play_song(request: Request, religion: ReligionEnum, song_name: str):
+    path = music_backend.get_audio_path(religion.value, song_name)
     if path and os.path.exists(path):
-        return FileResponse(path, media_type="audio/mpeg")
+        return media_responses.file_response(request, path, "audio/mpeg")
     return {"error": "File not found"}
 
+@app.get("/music/hls/{religion}/{song_name}/index.m3u8")
+def hls_playlist(request: Request, religion: ReligionEnum, song_name: str):
+    path = music_backend.get_audio_path(religion.value, song_name)
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="File not found")
+
+    digest = hls_packager.package(path, audio_index.get(path)["sha256"])
+    return media_responses.file_response(
+        request,
+        hls_packager.playlist_path(digest),
+        "application/vnd.apple.mpegurl",
+        cache_control="public, max-age=300"
+    )
+
+@app.get("/music/hls/segments/{digest}/{segment}")
+def hls_segment(request: Request, digest: str, segment: str):
+    path = hls_packager.segment_path(digest, segment)
+    if not path or not os.path.exists(path):
+        raise HTTPException(status_code=404, detail="Segment not found")
+
+    return media_responses.file_response(
+        request,
+        path,
+        "audio/mpeg",
+        cache_control="public, max-age=31536000, immutable"
+    )
+
 # ==================================================
 # 🕌 LANDMARKS API
 # ==================================================
 
-@app.get("/landmarks")
-def get_landmarks(
-    religion: ReligionEnum = ReligionEnum.All,
-    state: StateEnum = StateEnum.All
-):
-    if landmarks_df.empty:
-        return {"message": "Landmark dataset not loaded"}
-
-    df = landmarks_df.copy()
+landmark_bodies = static_responses.SnapshotResponses("landmark_responses")
 
+def filter_landmarks(df, religion, state):
     if religion != ReligionEnum.All:
         df = df[df["religion"] == religion.value]
-
     if state != StateEnum.All:
         df = df[df["state"] == state.value]
+    return df
+
+def landmark_records(landmarks_df, religion, state):
+    if landmarks_df.empty:
+        return {"message": "Landmark dataset not loaded"}
+
+    with tracing.span("filter"):
+        df = filter_landmarks(landmarks_df, religion, state)
 
     if df.empty:
         return {"message": "No landmarks found"}
 
     return clean_records(df.head(50).to_dict(orient="records"))
 
+@app.get("/landmarks")
+def get_landmarks(
+    request: Request,
+    religion: ReligionEnum = ReligionEnum.All,
+    state: StateEnum = StateEnum.All
+):
+    # Serialized and compressed once per dataset version and filter
+    version, landmarks_df = landmarks.get()
+    body = landmark_bodies.get(
+        (religion.value, state.value),
+        version,
+        lambda: landmark_records(landmarks_df, religion, state)
+    )
+    return static_responses.respond(request, body)
+
+geo_results = geo_cache.GeoCellCache("landmark_geo_cells")
+
+LOCATION_COLUMNS = ["name", "religion", "state", "city", "latitude", "longitude"]
+
+@app.get("/landmarks/nearby")
+def nearby_landmarks(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    religion: ReligionEnum = ReligionEnum.All,
+    state: StateEnum = StateEnum.All,
+    limit: int = Query(10, ge=1, le=50)
+):
+    version, landmarks_df = landmarks.get()
+    if landmarks_df.empty:
+        return {"message": "Landmark dataset not loaded"}
+
+    # Distances are measured from the geohash cell centre, so every
+    # user in the same cell shares one cached answer
+    def compute(cell, center_lat, center_lon):
+        with tracing.span("filter"):
+            df = filter_landmarks(landmarks_df, religion, state)
+            df = trip_planner.with_distances(df[LOCATION_COLUMNS], center_lat, center_lon)
+        return {
+            "cell": cell,
+            "landmarks": clean_records(df.head(50).round({"distance_km": 2}).to_dict(orient="records"))
+        }
+
+    result = geo_results.get(lat, lon, ("nearby", religion.value, state.value), version, compute)
+    return {"cell": result["cell"], "landmarks": result["landmarks"][:limit]}
+
+@app.get("/landmarks/itinerary")
+def landmark_itinerary(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    religion: ReligionEnum = ReligionEnum.All,
+    state: StateEnum = StateEnum.All,
+    days: int = Query(3, ge=1, le=10)
+):
+    version, landmarks_df = landmarks.get()
+    if landmarks_df.empty:
+        return {"message": "Landmark dataset not loaded"}
+
+    def compute(cell, center_lat, center_lon):
+        with tracing.span("filter"):
+            df = filter_landmarks(landmarks_df, religion, state)
+            return {
+                "cell": cell,
+                "days": trip_planner.plan_itinerary(df, (center_lat, center_lon), days)
+            }
+
+    return geo_results.get(lat, lon, ("itinerary", religion.value, state.value, days), version, compute)
+
 # ==================================================
 # 🥗 DIET API
 # ==================================================
@@ -234,15 +552,16 @@ def generate_diet(
     if food_df.empty:
         return {"message": "Food dataset not loaded"}
 
-    df = food_df[
-        (food_df["religion"] == religion.value) |
-        (food_df["religion"] == "All")
-    ]
+    with tracing.span("filter"):
+        df = food_df[
+            (food_df["religion"] == religion.value) |
+            (food_df["religion"] == "All")
+        ]
 
-    if diet_type == DietTypeEnum.Vegetarian:
-        df = df[df["type"] == "veg"]
-    else:
-        df = df[df["type"] == "non-veg"]
+        if diet_type == DietTypeEnum.Vegetarian:
+            df = df[df["type"] == "veg"]
+        else:
+            df = df[df["type"] == "non-veg"]
 
     if df.empty:
         return {"message": "No food available"}
@@ -266,18 +585,256 @@ def generate_diet(
 # ==================================================
 
 @app.get("/riddle")
-def get_riddle():
+def get_riddle(user_id: Optional[int] = None):
     if riddles_df.empty:
         return {"message": "Riddle dataset not loaded"}
 
     r = riddles_df.sample(1).iloc[0]
+    activity_log.log(user_id, "riddle_view")
 
     return {
+        "riddle_id": int(r.name),
         "riddle": str(r.get("riddle", "")),
         "hint": str(r.get("hint", "")),
         "points": int(clean_value(r.get("points", 0)))
     }
 
+# The riddle CSV is loaded once at startup, so its snapshot never changes
+riddle_bodies = static_responses.SnapshotResponses("riddle_responses")
+
+def riddle_metadata():
+    if riddles_df.empty:
+        return {"count": 0, "riddles": []}
+
+    riddles = [
+        {
+            "riddle_id": int(idx),
+            "religion": str(row.get("religion", "")),
+            "difficulty": str(row.get("difficulty", "")),
+            "points": int(clean_value(row.get("points", 0)) or 0)
+        }
+        for idx, row in riddles_df.iterrows()
+    ]
+    return {
+        "count": len(riddles),
+        "total_points": sum(r["points"] for r in riddles),
+        "by_religion": dict(Counter(r["religion"] for r in riddles)),
+        "by_difficulty": dict(Counter(r["difficulty"] for r in riddles)),
+        "riddles": riddles
+    }
+
+@app.get("/riddles/metadata")
+def get_riddle_metadata(request: Request):
+    body = riddle_bodies.get("metadata", 0, riddle_metadata)
+    return static_responses.respond(request, body)
+
+class RiddleAnswer(BaseModel):
+    riddle_id: int
+    answer: str
+    user_id: Optional[int] = None
+
+class RiddleAnswerBatch(BaseModel):
+    submissions: List[RiddleAnswer]
+
+def check_riddle_answer(submission):
+    if submission.riddle_id not in riddle_answers:
+        return {"riddle_id": submission.riddle_id, "error": "Unknown riddle"}
+
+    if submission.user_id is not None and progress.get_user(submission.user_id) is None:
+        return {"riddle_id": submission.riddle_id, "error": "Unknown user"}
+
+    result = riddle_answers.check(submission.riddle_id, submission.answer)
+    response = {"riddle_id": submission.riddle_id, **result}
+
+    activity_log.log(
+        submission.user_id,
+        "riddle_correct" if result["correct"] else "riddle_wrong",
+        result["points"]
+    )
+
+    if submission.user_id is not None:
+        response["progress"] = progress.record_answer(
+            submission.user_id, result["correct"], result["points"]
+        )
+
+    return response
+
+@app.post("/riddle/answer")
+def answer_riddle(submission: RiddleAnswer):
+    if submission.riddle_id not in riddle_answers:
+        raise HTTPException(status_code=404, detail="Unknown riddle")
+
+    if submission.user_id is not None and progress.get_user(submission.user_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown user")
+
+    return check_riddle_answer(submission)
+
+@app.post("/riddle/answer/batch")
+def answer_riddles(batch: RiddleAnswerBatch):
+    return {"results": [check_riddle_answer(s) for s in batch.submissions]}
+
+# ==================================================
+# 🏆 USER PROGRESS
+# ==================================================
+
+class NewUser(BaseModel):
+    name: str
+    religion: str = ""
+    state: str = ""
+
+@app.post("/users")
+def create_user(user: NewUser):
+    return progress.register_user(user.name, user.religion, user.state)
+
+@app.get("/users/{user_id}/progress")
+def user_progress(user_id: int, history: int = Query(10, ge=0, le=100)):
+    user = progress.get_user(user_id)
+    if user is None:
+        raise HTTPException(status_code=404, detail="Unknown user")
+
+    return {**user, "recent_activity": progress.recent_activity(user_id, history)}
+
+@app.get("/leaderboard")
+def get_leaderboard(
+    scope: LeaderboardScopeEnum = LeaderboardScopeEnum.Global,
+    value: Optional[str] = None,
+    k: int = Query(10, ge=1, le=100),
+    user_id: Optional[int] = None
+):
+    leaderboards.sync()
+
+    # State/religion boards default to the requesting user's own partition
+    if scope != LeaderboardScopeEnum.Global and not value:
+        user = progress.get_user(user_id) if user_id is not None else None
+        if user is None:
+            raise HTTPException(status_code=400, detail="value or user_id is required for this scope")
+        value = user[scope.value]
+
+    response = {
+        "scope": scope.value,
+        "value": value or "",
+        "top": leaderboards.top(scope.value, value or "", k)
+    }
+
+    if user_id is not None:
+        response["me"] = leaderboards.rank(user_id, scope.value)
+
+    return response
+
+# ==================================================
+# ⏳ BACKGROUND JOBS
+# ==================================================
+
+class DailyWisdomParams(BaseModel):
+    religion: ReligionEnum
+    content_type: ContentTypeEnum = ContentTypeEnum.Quote
+    language: LanguageEnum = LanguageEnum.English
+    languages: Optional[List[LanguageEnum]] = None
+
+class PhilosopherParams(BaseModel):
+    question: str
+    mode: PhilosopherModeEnum = PhilosopherModeEnum.Single
+    beliefs: Optional[List[ReligionEnum]] = None
+
+class DailyWisdomJob(BaseModel):
+    kind: Literal["daily_wisdom"]
+    params: DailyWisdomParams
+    idempotency_key: Optional[str] = None
+
+class PhilosopherJob(BaseModel):
+    kind: Literal["ask_philosopher"]
+    params: PhilosopherParams
+    idempotency_key: Optional[str] = None
+
+# "kind" selects the params model, so FastAPI rejects bad params with a 422
+JobRequest = Annotated[Union[DailyWisdomJob, PhilosopherJob], Body(discriminator="kind")]
+
+JOB_HANDLERS = {
+    "daily_wisdom": lambda p: daily_wisdom(**dict(DailyWisdomParams(**p)), debug=False),
+    "ask_philosopher": lambda p: ask_philosopher(**dict(PhilosopherParams(**p)), debug=False),
+}
+
+JOB_POLL_INTERVAL = 0.25
+MAX_JOB_WAIT = 60
+SSE_KEEPALIVE = 15
+
+job_store = jobs.JobStore()
+job_runner = jobs.JobRunner(job_store, JOB_HANDLERS)
+job_runner.resume()
+
+@app.on_event("shutdown")
+def close_job_runner():
+    job_runner.close()
+
+def job_links(job_id):
+    return {"self": f"/jobs/{job_id}", "events": f"/jobs/{job_id}/events"}
+
+@app.post("/jobs", status_code=202)
+def create_job(job_request: JobRequest, idempotency_key: Optional[str] = Header(None)):
+    try:
+        job = job_runner.submit(
+            job_request.kind,
+            jsonable_encoder(job_request.params),
+            idempotency_key or job_request.idempotency_key
+        )
+    except jobs.IdempotencyConflict as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"job_id": job["job_id"], "status": job["status"], "links": job_links(job["job_id"])}
+
+async def wait_for_job(job_id, timeout):
+    deadline = time.monotonic() + timeout
+    job = job_store.get(job_id)
+    while job is not None and job["status"] not in jobs.FINISHED and time.monotonic() < deadline:
+        await asyncio.sleep(JOB_POLL_INTERVAL)
+        job = job_store.get(job_id)
+    return job
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str, wait: float = Query(0, ge=0, le=MAX_JOB_WAIT)):
+    """
+    Job status and, once done, its result. wait=N long-polls for up to
+    N seconds until the job finishes.
+    """
+    job = await wait_for_job(job_id, wait)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return {**job, "links": job_links(job_id)}
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str):
+    """
+    Server-sent events: a "status" event on every change and a final
+    "done" or "failed" event carrying the job.
+    """
+    if job_store.get(job_id) is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+
+    async def stream():
+        last_status = None
+        last_sent = time.monotonic()
+        while True:
+            job = job_store.get(job_id)
+            if job is None:
+                yield "event: expired\ndata: {}\n\n"
+                return
+            if job["status"] in jobs.FINISHED:
+                yield f"event: {job['status']}\ndata: {json.dumps(job)}\n\n"
+                return
+            if job["status"] != last_status:
+                last_status = job["status"]
+                last_sent = time.monotonic()
+                yield f"event: status\ndata: {json.dumps({'status': last_status})}\n\n"
+            elif time.monotonic() - last_sent > SSE_KEEPALIVE:
+                last_sent = time.monotonic()
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # ==================================================
 # ROOT
 # ==================================================
@@ -0,0 +1,160 @@
+import os
+import secrets
+from email.utils import formatdate, parsedate_to_datetime
+
+from fastapi.responses import FileResponse, Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+MAX_RANGES = 8
+
+# Songs are immutable once published; revalidation uses the ETag
+CACHE_CONTROL = "public, max-age=2592000"
+
+
+# -------- VALIDATORS --------
+def file_validators(path):
+    """
+    Returns (etag, last_modified, size) for a file on disk.
+    The ETag is strong: it changes whenever size, mtime or inode change.
+    """
+    st = os.stat(path)
+    etag = f'"{st.st_ino:x}-{st.st_mtime_ns:x}-{st.st_size:x}"'
+    last_modified = formatdate(st.st_mtime, usegmt=True)
+    return etag, last_modified, st.st_size
+
+
+def etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [t.strip() for t in header.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+def _not_modified_since(header, path):
+    if not header:
+        return False
+    try:
+        since = parsedate_to_datetime(header).timestamp()
+    except (TypeError, ValueError):
+        return False
+    return int(os.stat(path).st_mtime) <= since
+
+
+# -------- RANGE PARSING --------
+def parse_range(header, size):
+    """
+    Parses a "bytes=..." Range header into a list of inclusive
+    (start, end) pairs. Returns None when the header should be ignored
+    and [] when no range is satisfiable.
+    """
+    if not header or not header.startswith("bytes="):
+        return None
+
+    ranges = []
+    for part in header[len("bytes="):].split(","):
+        part = part.strip()
+        if "-" not in part:
+            return None
+        first, _, last = part.partition("-")
+        try:
+            if first == "":
+                length = int(last)
+                if length == 0:
+                    continue
+                start, end = max(size - length, 0), size - 1
+            else:
+                start = int(first)
+                end = int(last) if last else size - 1
+        except ValueError:
+            return None
+        if start > end and last:
+            return None
+        if start >= size:
+            continue
+        ranges.append((start, min(end, size - 1)))
+
+    if len(ranges) > MAX_RANGES:
+        return None
+    return ranges
+
+
+def _read_range(path, start, end):
+    with open(path, "rb") as f:
+        f.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = f.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+
+def _read_multipart(path, ranges, size, media_type, boundary):
+    for start, end in ranges:
+        yield (
+            f"\r\n--{boundary}\r\n"
+            f"Content-Type: {media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{size}\r\n\r\n"
+        ).encode()
+        yield from _read_range(path, start, end)
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+# -------- RESPONSE --------
+def file_response(request, path, media_type, cache_control=CACHE_CONTROL):
+    """
+    Serves a file with conditional-request (If-None-Match /
+    If-Modified-Since -> 304) and Range (206, multi-range as
+    multipart/byteranges) support. Full-file responses go through
+    FileResponse so the server can use its zero-copy path.
+    """
+    etag, last_modified, size = file_validators(path)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": last_modified,
+        "Cache-Control": cache_control,
+        "Accept-Ranges": "bytes",
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if etag_matches(if_none_match, etag) or (
+        if_none_match is None
+        and _not_modified_since(request.headers.get("if-modified-since"), path)
+    ):
+        return Response(status_code=304, headers=headers)
+
+    ranges = parse_range(request.headers.get("range"), size)
+
+    # If-Range: only honour the range if the client's copy is current
+    if_range = request.headers.get("if-range")
+    if ranges is not None and if_range and if_range.strip() not in (etag, last_modified):
+        ranges = None
+
+    if ranges is None:
+        return FileResponse(path, media_type=media_type, headers=headers)
+
+    if not ranges:
+        headers["Content-Range"] = f"bytes */{size}"
+        return Response(status_code=416, headers=headers)
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _read_range(path, start, end),
+            status_code=206,
+            media_type=media_type,
+            headers=headers,
+        )
+
+    boundary = secrets.token_hex(12)
+    return StreamingResponse(
+        _read_multipart(path, ranges, size, media_type, boundary),
+        status_code=206,
+        media_type=f"multipart/byteranges; boundary={boundary}",
+        headers=headers,
+    )
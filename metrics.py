@@ -0,0 +1,233 @@
+import threading
+import time
+from bisect import bisect_left
+
+# Default latency buckets in seconds: 1 ms .. 2 min (LLM calls are slow)
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0,
+)
+
+
+# -------- SHARDED STORAGE --------
+class _Sharded:
+    """
+    Per-thread value shards. A thread only ever writes its own dict,
+    so updates need no lock; a scrape sums copies of all shards.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+        self._shards = []
+
+    def _shard(self):
+        shard = getattr(self._local, "values", None)
+        if shard is None:
+            shard = self._local.values = {}
+            self._shards.append(shard)
+        return shard
+
+    def _collect(self, merge):
+        totals = {}
+        for shard in list(self._shards):
+            for key, value in shard.copy().items():
+                totals[key] = merge(totals.get(key), value)
+        return totals
+
+
+def _label_key(labelnames, labels):
+    return tuple(str(labels.get(name, "")) for name in labelnames)
+
+
+def _format_labels(labelnames, key, extra=()):
+    pairs = list(zip(labelnames, key)) + list(extra)
+    if not pairs:
+        return ""
+    body = ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+    return "{" + body + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+# -------- METRIC TYPES --------
+class Counter(_Sharded):
+    kind = "counter"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__()
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+
+    def inc(self, amount=1, **labels):
+        shard = self._shard()
+        key = _label_key(self.labelnames, labels)
+        shard[key] = shard.get(key, 0) + amount
+
+    def value(self, **labels):
+        totals = self._collect(lambda a, b: (a or 0) + b)
+        return totals.get(_label_key(self.labelnames, labels), 0)
+
+    def render(self):
+        totals = self._collect(lambda a, b: (a or 0) + b)
+        for key, value in sorted(totals.items()):
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Gauge(Counter):
+    """
+    Up/down gauge (inc/dec from any thread), or a callback gauge whose
+    value is read at scrape time via set_function().
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name, help, labelnames=()):
+        super().__init__(name, help, labelnames)
+        self._functions = {}
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def set_function(self, fn, **labels):
+        self._functions[_label_key(self.labelnames, labels)] = fn
+
+    def render(self):
+        yield from super().render()
+        for key, fn in sorted(self._functions.items()):
+            try:
+                value = fn()
+            except Exception:
+                continue
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class Histogram(_Sharded):
+    kind = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+        super().__init__()
+        self.name, self.help, self.labelnames = name, help, tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        shard = self._shard()
+        key = _label_key(self.labelnames, labels)
+        cell = shard.get(key)
+        if cell is None:
+            # bucket counts..., +Inf count, sum
+            cell = shard[key] = [0] * (len(self.buckets) + 2)
+        cell[bisect_left(self.buckets, value)] += 1
+        cell[-1] += value
+
+    def time(self, **labels):
+        return _Timer(self, labels)
+
+    def render(self):
+        def merge(a, b):
+            return list(b) if a is None else [x + y for x, y in zip(a, b)]
+
+        for key, cell in sorted(self._collect(merge).items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), cell[:-1]):
+                cumulative += count
+                labels = _format_labels(self.labelnames, key, [("le", _format_value(bound))])
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _format_labels(self.labelnames, key)
+            yield f"{self.name}_sum{labels} {_format_value(cell[-1])}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class _Timer:
+    def __init__(self, histogram, labels):
+        self.histogram, self.labels = histogram, labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(time.perf_counter() - self.start, **self.labels)
+        return False
+
+
+# -------- REGISTRY --------
+_registry = []
+
+
+def _register(metric):
+    _registry.append(metric)
+    return metric
+
+
+def counter(name, help, labelnames=()):
+    return _register(Counter(name, help, labelnames))
+
+
+def gauge(name, help, labelnames=()):
+    return _register(Gauge(name, help, labelnames))
+
+
+def histogram(name, help, labelnames=(), buckets=LATENCY_BUCKETS):
+    return _register(Histogram(name, help, labelnames, buckets))
+
+
+def render():
+    """
+    All registered metrics in the Prometheus text exposition format.
+    """
+    lines = []
+    for metric in _registry:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.kind}")
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# -------- APPLICATION METRICS --------
+REQUEST_LATENCY = histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route", "status")
+)
+REQUESTS_IN_FLIGHT = gauge("http_requests_in_flight", "Requests currently being handled")
+MODEL_QUEUE = gauge("model_queue_depth", "Calls waiting for a model lock", ("model",))
+
+LLM_LATENCY = histogram("llm_generate_seconds", "LLM completion latency", ("model",))
+LLM_PROMPT_TOKENS = counter("llm_prompt_tokens_total", "Prompt tokens processed", ("model",))
+LLM_COMPLETION_TOKENS = counter("llm_completion_tokens_total", "Completion tokens generated", ("model",))
+LLM_COMPLETIONS = counter(
+    "llm_completions_total", "Completions by finish reason (length, stop, stop_criteria)", ("model", "reason")
+)
+LLM_TOKENS_PER_SECOND = histogram(
+    "llm_completion_tokens_per_second", "Decode throughput per call", ("model",),
+    buckets=(1, 2, 5, 10, 15, 20, 30, 50, 75, 100, 200),
+)
+CONTENT_LATENCY = histogram(
+    "content_generation_seconds", "generate_content / philosopher.generate latency incl. cleanup",
+    ("kind",),
+)
+TRANSLATION_LATENCY = histogram(
+    "translation_seconds", "NLLB translation latency by target language", ("language",)
+)
+
+JOBS = counter("jobs_total", "Background generation jobs by kind and status", ("kind", "status"))
+COALESCED_REQUESTS = counter(
+    "singleflight_coalesced_total", "Calls that reused an identical in-flight call", ("flight",)
+)
+CACHE_REQUESTS = counter("cache_requests_total", "Cache lookups by cache and result", ("cache", "result"))
+DATASET_ROWS = gauge("dataset_rows", "Rows in each loaded dataset snapshot", ("dataset",))
+
+
+def cache_hit(cache):
+    CACHE_REQUESTS.inc(cache=cache, result="hit")
+
+
+def cache_miss(cache):
+    CACHE_REQUESTS.inc(cache=cache, result="miss")
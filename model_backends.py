@@ -0,0 +1,384 @@
+import json
+import os
+import threading
+import time
+
+import metrics
+import stop_criteria
+
+GGUF_MODEL_PATH = "tinyllama_lora_merged.gguf"
+NLLB_MODEL_NAME = "facebook/nllb-200-distilled-600M"
+
+# "fp32" keeps NLLB in full precision; "int8" applies dynamic int8
+# quantization to its linear layers (about 3x smaller, faster on CPU).
+# Compare both with `python -m benchmarks.translation`.
+TRANSLATOR_BACKEND = os.environ.get("TRANSLATOR_BACKEND", "fp32")
+
+# When set, workers forward inference to `python inference_sidecar.py`
+# on this Unix socket instead of loading the models in-process.
+INFERENCE_SOCKET = os.environ.get("INFERENCE_SOCKET", "")
+
+# Llama settings per caller, as each app used to hardcode them
+LLAMA_SETTINGS = {
+    "wisdom": {"n_gpu_layers": 8, "n_batch": 8},
+    "philosopher": {"n_ctx": 2048, "n_threads": 8, "n_gpu_layers": 0},
+}
+
+# "prompt_lookup" drafts LLAMA_DRAFT_TOKENS tokens per step by n-gram
+# lookup in the prompt and the text generated so far, and verifies them
+# in one forward pass (no draft model). Greedy output is unchanged.
+# Measure with `python -m benchmarks.speculative`.
+LLAMA_SPECULATIVE = os.environ.get("LLAMA_SPECULATIVE", "off")
+LLAMA_DRAFT_TOKENS = int(os.environ.get("LLAMA_DRAFT_TOKENS", "2"))
+
+# Host profile written by `python llama_tuning.py`; its settings
+# override LLAMA_SETTINGS for every caller.
+LLAMA_PROFILE = os.environ.get("LLAMA_PROFILE", "llama_profile.json")
+
+
+def load_llama_profile(path=LLAMA_PROFILE):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f).get("settings", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def llama_settings(name):
+    return {**LLAMA_SETTINGS.get(name, {}), **load_llama_profile()}
+
+
+def shared_llama_settings():
+    """
+    Load settings for one model serving every caller: the caller
+    settings merged in LLAMA_SETTINGS order, then the host profile.
+    """
+    merged = {}
+    for settings in LLAMA_SETTINGS.values():
+        merged.update(settings)
+    return {**merged, **load_llama_profile()}
+
+
+# -------- GENERATION --------
+class LlamaGenerator:
+    """
+    llama.cpp completion backend. The model is loaded on first use and
+    calls are serialized, since a Llama instance is not thread-safe.
+    Called like a Llama object: backend(prompt, max_tokens=...), plus
+    an optional stop_when spec (see stop_criteria) that streams the
+    completion and stops decoding once the structure is complete.
+    """
+
+    def __init__(self, model_path=GGUF_MODEL_PATH, name="llm", speculative=LLAMA_SPECULATIVE,
+                 draft_tokens=LLAMA_DRAFT_TOKENS, **settings):
+        if speculative not in ("off", "prompt_lookup"):
+            raise ValueError(f"unknown LLAMA_SPECULATIVE mode {speculative!r}")
+        self.model_path = model_path
+        self.name = name
+        self.speculative = speculative
+        self.draft_tokens = draft_tokens
+        self.settings = settings
+        self._llm = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self._llm is None:
+            with self._lock:
+                if self._llm is None:
+                    from llama_cpp import Llama
+                    settings = dict(self.settings)
+                    if self.speculative == "prompt_lookup":
+                        from llama_cpp.llama_speculative import LlamaPromptLookupDecoding
+                        settings["draft_model"] = LlamaPromptLookupDecoding(
+                            num_pred_tokens=self.draft_tokens
+                        )
+                    self._llm = Llama(model_path=self.model_path, **settings)
+        return self
+
+    def reset(self):
+        """
+        Drops the KV cache, so the next call evaluates its whole prompt
+        instead of reusing a matching prefix.
+        """
+        self.load()
+        with self._lock:
+            self._llm.reset()
+
+    def __call__(self, prompt, stop_when=None, **kwargs):
+        self.load()
+        metrics.MODEL_QUEUE.inc(model=self.name)
+        with self._lock:
+            metrics.MODEL_QUEUE.dec(model=self.name)
+            if stop_when is None:
+                return self._llm(prompt, **kwargs)
+            return self._stream_until(prompt, stop_criteria.build(stop_when), kwargs)
+
+    def _stream_until(self, prompt, criterion, kwargs):
+        pieces = []
+        finish_reason = None
+        stream = self._llm(prompt, stream=True, **kwargs)
+        for chunk in stream:
+            choice = chunk["choices"][0]
+            pieces.append(choice["text"])
+            finish_reason = choice.get("finish_reason")
+            if criterion.feed(choice["text"]):
+                finish_reason = stop_criteria.STOP_REASON
+                break
+        # Closing the generator stops llama.cpp from decoding further
+        stream.close()
+
+        prompt_tokens = len(self._llm.tokenize(prompt.encode("utf-8")))
+        completion_tokens = len(pieces)
+        return {
+            "choices": [{"text": "".join(pieces), "finish_reason": finish_reason}],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+
+# -------- TRANSLATION --------
+class NllbTranslator:
+    """
+    NLLB-200 translation backend, loaded on first use. With
+    quantize=True the nn.Linear weights are converted to int8 after
+    loading; activations stay float and are quantized per batch.
+    """
+
+    def __init__(self, model_name=NLLB_MODEL_NAME, src_lang="eng_Latn", quantize=False):
+        self.model_name = model_name
+        self.src_lang = src_lang
+        self.quantize = quantize
+        self.tokenizer = None
+        self.model = None
+        self._lock = threading.Lock()
+
+    def load(self):
+        if self.model is None:
+            with self._lock:
+                if self.model is None:
+                    from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+                    self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+                    model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name).eval()
+                    if self.quantize:
+                        import torch
+                        model = torch.ao.quantization.quantize_dynamic(
+                            model, {torch.nn.Linear}, dtype=torch.qint8
+                        )
+                    self.model = model
+        return self
+
+    def translate(self, text, lang_code):
+        self.load()
+        metrics.MODEL_QUEUE.inc(model="nllb")
+        with self._lock:
+            metrics.MODEL_QUEUE.dec(model="nllb")
+            self.tokenizer.src_lang = self.src_lang
+
+            inputs = self.tokenizer(
+                text,
+                return_tensors="pt",
+                truncation=True,
+                max_length=512
+            )
+
+            translated_tokens = self.model.generate(
+                **inputs,
+                forced_bos_token_id=self.tokenizer.convert_tokens_to_ids(lang_code),
+                max_length=1024
+            )
+
+            return self.tokenizer.decode(
+                translated_tokens[0],
+                skip_special_tokens=True
+            )
+
+    def translate_many(self, text, lang_codes):
+        """
+        Translates one text into several languages. The encoder runs
+        once; its output is repeated across a batch whose rows differ
+        only in the forced target-language token, and all targets are
+        decoded together. Returns {lang_code: text}.
+        """
+        self.load()
+        import torch
+        from transformers.modeling_outputs import BaseModelOutput
+
+        metrics.MODEL_QUEUE.inc(model="nllb")
+        with self._lock:
+            metrics.MODEL_QUEUE.dec(model="nllb")
+            self.tokenizer.src_lang = self.src_lang
+
+            inputs = self.tokenizer(
+                text,
+                return_tensors="pt",
+                truncation=True,
+                max_length=512
+            )
+            batch = len(lang_codes)
+
+            with torch.inference_mode():
+                encoded = self.model.get_encoder()(**inputs)
+                hidden = encoded.last_hidden_state.expand(batch, -1, -1)
+                attention_mask = inputs["attention_mask"].expand(batch, -1)
+
+                # Each row starts with </s> <lang>, which is what
+                # forced_bos_token_id produces for a single target
+                start = self.model.config.decoder_start_token_id
+                decoder_input_ids = torch.tensor(
+                    [[start, self.tokenizer.convert_tokens_to_ids(code)] for code in lang_codes]
+                )
+
+                translated_tokens = self.model.generate(
+                    encoder_outputs=BaseModelOutput(last_hidden_state=hidden),
+                    attention_mask=attention_mask,
+                    decoder_input_ids=decoder_input_ids,
+                    max_length=1024
+                )
+
+            texts = self.tokenizer.batch_decode(translated_tokens, skip_special_tokens=True)
+            return dict(zip(lang_codes, texts))
+
+
+# -------- INSTRUMENTATION --------
+class InstrumentedGenerator:
+    """
+    Records latency and token counts of any generation backend.
+    """
+
+    def __init__(self, name, backend):
+        self.name = name
+        self.backend = backend
+
+    def load(self):
+        self.backend.load()
+        return self
+
+    def __call__(self, prompt, **kwargs):
+        start = time.perf_counter()
+        output = self.backend(prompt, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        usage = output.get("usage") or {}
+        completion = usage.get("completion_tokens", 0)
+        metrics.LLM_LATENCY.observe(elapsed, model=self.name)
+        metrics.LLM_PROMPT_TOKENS.inc(usage.get("prompt_tokens", 0), model=self.name)
+        metrics.LLM_COMPLETION_TOKENS.inc(completion, model=self.name)
+        reason = output["choices"][0].get("finish_reason") or "unknown"
+        metrics.LLM_COMPLETIONS.inc(model=self.name, reason=reason)
+        if completion and elapsed > 0:
+            metrics.LLM_TOKENS_PER_SECOND.observe(completion / elapsed, model=self.name)
+        return output
+
+
+class InstrumentedTranslator:
+    """
+    Records translation latency per target language.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+
+    def load(self):
+        self.backend.load()
+        return self
+
+    def translate(self, text, lang_code):
+        with metrics.TRANSLATION_LATENCY.time(language=lang_code):
+            return self.backend.translate(text, lang_code)
+
+    def translate_many(self, text, lang_codes):
+        if len(lang_codes) == 1:
+            return {lang_codes[0]: self.translate(text, lang_codes[0])}
+        if not hasattr(self.backend, "translate_many"):
+            return {code: self.translate(text, code) for code in lang_codes}
+        with metrics.TRANSLATION_LATENCY.time(language="batch"):
+            return self.backend.translate_many(text, lang_codes)
+
+
+# -------- REGISTRY --------
+_generators = {}
+_translator = None
+_registry_lock = threading.Lock()
+
+
+_local_generators = {}
+_local_lock = threading.Lock()
+
+
+def local_generator(name):
+    """
+    In-process llama backend for a caller. Callers whose load settings
+    match (always the case once a llama_profile.json exists) share one
+    backend, so a process holds a single copy of the model per distinct
+    configuration rather than one per caller.
+    """
+    settings = llama_settings(name)
+    key = json.dumps([GGUF_MODEL_PATH, LLAMA_SPECULATIVE, LLAMA_DRAFT_TOKENS, settings], sort_keys=True)
+    with _local_lock:
+        backend = _local_generators.get(key)
+        if backend is None:
+            backend = LlamaGenerator(GGUF_MODEL_PATH, name=name, **settings)
+            _local_generators[key] = backend
+    return backend
+
+
+def local_translator(backend=TRANSLATOR_BACKEND):
+    if backend not in ("fp32", "int8"):
+        raise ValueError(f"unknown TRANSLATOR_BACKEND {backend!r}")
+    return NllbTranslator(quantize=backend == "int8")
+
+
+def _default_generator(name):
+    if INFERENCE_SOCKET:
+        from inference_sidecar import SidecarGenerator
+        return SidecarGenerator(name, INFERENCE_SOCKET)
+    return local_generator(name)
+
+
+def _default_translator():
+    if INFERENCE_SOCKET:
+        from inference_sidecar import SidecarTranslator
+        return SidecarTranslator(INFERENCE_SOCKET)
+    return local_translator()
+
+
+def get_generator(name):
+    """
+    Generation backend for a caller ("wisdom" or "philosopher").
+    """
+    backend = _generators.get(name)
+    if backend is None:
+        with _registry_lock:
+            backend = _generators.get(name)
+            if backend is None:
+                backend = InstrumentedGenerator(name, _default_generator(name))
+                _generators[name] = backend
+    return backend
+
+
+def set_generator(backend, name=None):
+    """
+    Replaces the generation backend for one caller, or for all callers
+    when name is None (e.g. a fake backend for benchmarks).
+    """
+    with _registry_lock:
+        for key in [name] if name else LLAMA_SETTINGS:
+            _generators[key] = InstrumentedGenerator(key, backend)
+
+
+def get_translator():
+    global _translator
+    if _translator is None:
+        with _registry_lock:
+            if _translator is None:
+                _translator = InstrumentedTranslator(_default_translator())
+    return _translator
+
+
+def set_translator(backend):
+    global _translator
+    with _registry_lock:
+        _translator = InstrumentedTranslator(backend)
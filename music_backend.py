@@ -1,7 +1,118 @@
 import os
+import threading
+import time
+
+import metrics
 
 AUDIO_ROOT = "audio"
 
+# Seconds between directory mtime checks
+CHECK_INTERVAL = 2.0
+
+# API religion names (ReligionEnum) -> audio folder names
+RELIGION_ALIASES = {
+    "hindu": "hinduism",
+    "muslim": "islam",
+    "christian": "christianity",
+    "sikh": "sikhism",
+    "buddhist": "buddhism",
+    "jain": "jainism",
+}
+
+
+# -------- LIBRARY INDEX --------
+class LibraryIndex:
+    """
+    In-memory view of the audio/ tree.
+
+    Built once, then rebuilt only when the mtime of audio/ or one of
+    its religion folders changes (checked at most every CHECK_INTERVAL
+    seconds). Listing and path resolution are dict lookups.
+    """
+
+    def __init__(self, root=AUDIO_ROOT):
+        self.root = root
+        self._lock = threading.Lock()
+        self._mtimes = None
+        self._checked = 0.0
+        self._library = {}
+        self._paths = {}
+        self._canonical = {}
+
+    def _scan_mtimes(self):
+        if not os.path.isdir(self.root):
+            return {}
+        mtimes = {self.root: os.stat(self.root).st_mtime_ns}
+        with os.scandir(self.root) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    mtimes[entry.path] = entry.stat().st_mtime_ns
+        return mtimes
+
+    def _rebuild(self, mtimes):
+        library, paths, canonical = {}, {}, {}
+
+        for folder in sorted(p for p in mtimes if p != self.root):
+            religion = os.path.basename(folder).capitalize()
+            songs = sorted(f for f in os.listdir(folder) if f.endswith(".mp3"))
+            library[religion] = songs
+            paths[religion] = {song: os.path.join(folder, song) for song in songs}
+            canonical[religion.lower()] = religion
+
+        for alias, target in RELIGION_ALIASES.items():
+            if target in canonical:
+                canonical.setdefault(alias, canonical[target])
+
+        self._library, self._paths, self._canonical = library, paths, canonical
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._mtimes is not None and now - self._checked < CHECK_INTERVAL:
+            return
+
+        with self._lock:
+            if self._mtimes is not None and now - self._checked < CHECK_INTERVAL:
+                return
+            mtimes = self._scan_mtimes()
+            if mtimes != self._mtimes:
+                metrics.cache_miss("music_library")
+                self._rebuild(mtimes)
+                self._mtimes = mtimes
+            else:
+                metrics.cache_hit("music_library")
+            self._checked = now
+
+    def library(self):
+        self._refresh()
+        return self._library
+
+    def version(self):
+        """
+        Token that changes whenever the library is rebuilt.
+        """
+        self._refresh()
+        return tuple(sorted((self._mtimes or {}).items()))
+
+    def resolve(self, religion_name):
+        """
+        Canonical folder name for a religion ("hindu", "HINDUISM" ->
+        "Hinduism"), or None.
+        """
+        self._refresh()
+        return self._canonical.get(str(religion_name).strip().lower())
+
+    def songs(self, religion_name):
+        religion = self.resolve(religion_name)
+        return self._library.get(religion, [])
+
+    def path(self, religion_name, song_name):
+        religion = self.resolve(religion_name)
+        return self._paths.get(religion, {}).get(song_name)
+
+
+library_index = LibraryIndex()
+
+
 # -------- LOAD RELIGION FOLDERS --------
 def load_library():
     """
@@ -11,41 +122,21 @@ def load_library():
         "Christianity": ["song1.mp3"]
     }
     """
-    library = {}
-
-    if not os.path.exists(AUDIO_ROOT):
-        return library
-
-    for religion in os.listdir(AUDIO_ROOT):
-        religion_path = os.path.join(AUDIO_ROOT, religion)
-
-        if os.path.isdir(religion_path):
-            songs = [
-                f for f in os.listdir(religion_path)
-                if f.endswith(".mp3")
-            ]
-            library[religion.capitalize()] = songs
-
-    return library
+    return library_index.library()
 
 
 def get_songs_by_religion(religion_name):
     """
     Returns list of songs for selected religion
     """
-    library = load_library()
-    return library.get(religion_name.capitalize(), [])
+    return library_index.songs(religion_name)
 
 
 def get_audio_path(religion_name, song_name):
     """
-    Returns full path of selected song
+    Returns full path of selected song, or None if it is not in the library
     """
-    return os.path.join(
-        AUDIO_ROOT,
-        religion_name.lower(),
-        song_name
-    )
+    return library_index.path(religion_name, song_name)
 
 
 # -------- Example Usage --------
@@ -70,7 +161,7 @@ if __name__ == "__main__":
             song = input("Select song: ")
             path = get_audio_path(religion, song)
 
-            if os.path.exists(path):
+            if path and os.path.exists(path):
                 print("Playing file path:", path)
             else:
                 print("File not found.")
@@ -0,0 +1,73 @@
+"""
+Philosopher answers, shared by the API (main.py) and the Streamlit app
+(Interfaith_and__faith_based.py). Importing it loads no model.
+"""
+
+import model_backends
+import metrics
+import tracing
+
+# -----------------------------------------
+# CONFIG
+# -----------------------------------------
+MAX_NEW_TOKENS = 70
+
+# -----------------------------------------
+# BELIEF SYSTEMS
+# -----------------------------------------
+BELIEFS = {
+    "Hinduism": ["Bhagavad Gita", "Upanishads", "Ramayana"],
+    "Buddhism": ["Majjhima Nikaya", "Sutta Nipata"],
+    "Jainism": ["Acaranga Sutra", "Samayasara"],
+    "Christianity": ["Bible"],
+    "Islam": ["Quran"],
+    "Atheism": ["The Age of Reason", "Human Values"]
+}
+
+# -----------------------------------------
+# GENERATION
+# -----------------------------------------
+def generate(prompt):
+    with metrics.CONTENT_LATENCY.time(kind="philosopher"):
+        with tracing.span("generate"):
+            output = model_backends.get_generator("philosopher")(
+                prompt,
+                max_tokens=MAX_NEW_TOKENS,
+                temperature=0.25,
+                top_p=0.85,
+                repeat_penalty=1.25,
+                stop=["Question:", "\n\n"],
+                stop_when={"sentences": 2, "terminators": "."}
+            )
+
+        with tracing.span("clean"):
+            text = output["choices"][0]["text"].strip()
+            text = text.replace("\n", " ")
+            sentences = text.split(". ")
+            return ". ".join(sentences[:2]).strip() + "."
+
+def build_prompt(belief, book, question):
+    return f"""
+You are a calm philosophical thinker representing {belief}.
+Base your reasoning only on the philosophical themes found in {book}.
+
+STRICT RESPONSE RULES:
+
+1. EXACTLY 2 sentences.
+2. Calm, emotionally neutral tone.
+3. No defense of any religion.
+4. No criticism of any religion.
+5. No superiority claims.
+6. Do not justify hate.
+7. Do not attack or support any belief.
+8. Do not describe historical facts.
+9. Do not repeat aggressive wording from the question.
+10. Focus only on inner psychological and philosophical insight.
+
+If the question expresses anger, rejection, or hatred, interpret it as a reflection of inner conflict and respond with wisdom about understanding, awareness, and self-examination.
+
+Question:
+{question}
+
+Answer:
+"""
@@ -0,0 +1,167 @@
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "profiles")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_INTERVAL = 0.005        # seconds between stack samples
+MAX_PROFILES_PER_ROUTE = 20
+MAX_STACK_DEPTH = 128
+
+# Requests carrying "X-Profile: <ADMIN_TOKEN>" are always profiled and
+# the admin endpoints require the same token. Empty disables both.
+ADMIN_TOKEN = os.environ.get("ADMIN_TOKEN", "")
+
+_NAME_RE = re.compile(r"^\w[\w.-]*$")
+
+
+def is_admin(token):
+    return bool(ADMIN_TOKEN) and bool(token) and hmac.compare_digest(
+        token.encode("utf-8"), ADMIN_TOKEN.encode("utf-8")
+    )
+
+
+def should_profile(request):
+    if is_admin(request.headers.get("x-profile")):
+        return True
+    return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+
+# -------- SAMPLER --------
+class StackSampler:
+    """
+    Samples the stacks of threads running a request's endpoint.
+
+    Handlers run in threadpool threads, so a profiler started in the
+    middleware would only see the event loop. Instead a background
+    thread reads sys._current_frames() every PROFILE_INTERVAL and keeps
+    stacks that contain the endpoint's code object (known from the ASGI
+    scope once routing happened). Concurrent requests to the same route
+    are sampled too. Output is in collapsed-stack format, ready for
+    flamegraph.pl or speedscope.
+    """
+
+    def __init__(self, scope, interval=PROFILE_INTERVAL):
+        self.scope = scope
+        self.interval = interval
+        self.stacks = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self.stacks
+
+    def _run(self):
+        me = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            endpoint = self.scope.get("endpoint")
+            code = getattr(endpoint, "__code__", None)
+            if code is None:
+                continue
+
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == me:
+                    continue
+                stack = self._collapse(frame, code)
+                if stack:
+                    self.stacks[stack] += 1
+                    self.samples += 1
+
+    @staticmethod
+    def _collapse(frame, endpoint_code):
+        names = []
+        found = False
+        while frame is not None and len(names) < MAX_STACK_DEPTH:
+            co = frame.f_code
+            names.append(f"{os.path.basename(co.co_filename)}:{co.co_name}")
+            if co is endpoint_code:
+                found = True
+                break
+            frame = frame.f_back
+        if not found:
+            return None
+        return ";".join(reversed(names))
+
+
+# -------- STORAGE --------
+def _route_dir(route):
+    slug = re.sub(r"[^\w]+", "_", route).strip("_") or "root"
+    return os.path.join(PROFILE_DIR, slug)
+
+
+def save(route, stacks, elapsed):
+    """
+    Writes one collapsed-stack profile and keeps only the newest
+    MAX_PROFILES_PER_ROUTE files for that route.
+    """
+    if not stacks:
+        return None
+
+    route_dir = _route_dir(route)
+    os.makedirs(route_dir, exist_ok=True)
+    name = f"{datetime.now().strftime('%Y%m%d-%H%M%S-%f')}-{int(elapsed * 1000)}ms.folded"
+    with open(os.path.join(route_dir, name), "w", encoding="utf-8") as f:
+        for stack, count in stacks.most_common():
+            f.write(f"{stack} {count}\n")
+
+    files = sorted(os.listdir(route_dir))
+    for old in files[:-MAX_PROFILES_PER_ROUTE]:
+        os.remove(os.path.join(route_dir, old))
+    return name
+
+
+def list_profiles():
+    profiles = []
+    if not os.path.isdir(PROFILE_DIR):
+        return profiles
+    for route in sorted(os.listdir(PROFILE_DIR)):
+        route_dir = os.path.join(PROFILE_DIR, route)
+        for name in sorted(os.listdir(route_dir), reverse=True):
+            st = os.stat(os.path.join(route_dir, name))
+            profiles.append({
+                "route": route,
+                "name": name,
+                "size": st.st_size,
+                "created_at": datetime.fromtimestamp(st.st_mtime).isoformat(timespec="seconds"),
+            })
+    return profiles
+
+
+def profile_path(route, name):
+    """
+    Path of a stored profile, or None for unsafe or unknown names.
+    """
+    if not _NAME_RE.match(route) or not _NAME_RE.match(name):
+        return None
+    path = os.path.join(PROFILE_DIR, route, name)
+    return path if os.path.isfile(path) else None
+
+
+def profile_request(scope):
+    """
+    Starts a sampler for one request; call .finish(route) when done.
+    """
+    return _RequestProfile(scope)
+
+
+class _RequestProfile:
+    def __init__(self, scope):
+        self.start = time.perf_counter()
+        self.sampler = StackSampler(scope).start()
+
+    def finish(self, route):
+        stacks = self.sampler.stop()
+        return save(route, stacks, time.perf_counter() - self.start)
@@ -0,0 +1,264 @@
+import csv
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+DB_PATH = os.environ.get("PROGRESS_DB", "progress.db")
+USERS_CSV = "users.csv"
+ACTIVITY_CSV = "activity_log.csv"
+
+# Same thresholds as the Streamlit riddle game (content_task.py):
+# below 50 XP "Seeker", below 150 "Explorer", below 300 "Pilgrim".
+LEVELS = [
+    (50, "Seeker"),
+    (150, "Explorer"),
+    (300, "Pilgrim"),
+]
+TOP_TITLE = "Spiritual Master"
+
+USER_FIELDS = [
+    "user_id", "name", "religion", "state", "total_points",
+    "current_streak", "longest_streak", "title", "last_activity_date",
+]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL DEFAULT '',
+    religion TEXT NOT NULL DEFAULT '',
+    state TEXT NOT NULL DEFAULT '',
+    total_points INTEGER NOT NULL DEFAULT 0,
+    current_streak INTEGER NOT NULL DEFAULT 0,
+    longest_streak INTEGER NOT NULL DEFAULT 0,
+    title TEXT NOT NULL DEFAULT 'Seeker',
+    last_activity_date TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS activity (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER NOT NULL,
+    date TEXT NOT NULL,
+    activity_type TEXT NOT NULL,
+    points_earned INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL
+);
+"""
+
+
+def title_for_points(points):
+    """
+    Returns the level title for a point total.
+    """
+    for limit, title in LEVELS:
+        if points < limit:
+            return title
+    return TOP_TITLE
+
+
+def _int(value, default=0):
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return default
+
+
+# -------- ENGINE --------
+class ProgressEngine:
+    """
+    Append-only activity log plus per-user aggregates in SQLite (WAL).
+
+    Every event is one INSERT into `activity` and one single-row UPDATE
+    of `users` inside the same transaction, so points, streaks and
+    titles are maintained incrementally without rescanning history.
+    """
+
+    def __init__(self, db_path=DB_PATH):
+        self.db_path = db_path
+        self._local = threading.local()
+
+        conn = self._conn()
+        conn.executescript(SCHEMA)
+        if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] == 0:
+            self._seed_from_csv(conn)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _seed_from_csv(self, conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another worker may have seeded while this one waited for
+            # the write lock; activity rows are not idempotent
+            if conn.execute("SELECT COUNT(*) FROM users").fetchone()[0] != 0:
+                conn.execute("COMMIT")
+                return
+
+            if os.path.exists(USERS_CSV):
+                with open(USERS_CSV, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        points = _int(row.get("total_points"))
+                        conn.execute(
+                            "INSERT OR IGNORE INTO users VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                            (
+                                _int(row.get("user_id")),
+                                row.get("name", ""),
+                                row.get("religion", ""),
+                                row.get("state", ""),
+                                points,
+                                _int(row.get("current_streak")),
+                                _int(row.get("longest_streak")),
+                                row.get("title") or title_for_points(points),
+                                row.get("last_activity_date", ""),
+                            ),
+                        )
+
+            if os.path.exists(ACTIVITY_CSV):
+                with open(ACTIVITY_CSV, newline="", encoding="utf-8") as f:
+                    for row in csv.DictReader(f):
+                        conn.execute(
+                            "INSERT INTO activity (user_id, date, activity_type, points_earned, created_at) "
+                            "VALUES (?, ?, ?, ?, ?)",
+                            (
+                                _int(row.get("user_id")),
+                                row.get("date", ""),
+                                row.get("activity_type", ""),
+                                _int(row.get("points_earned")),
+                                row.get("date", ""),
+                            ),
+                        )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    # ---- users ----
+    def get_user(self, user_id):
+        row = self._conn().execute(
+            "SELECT * FROM users WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def find_user(self, name):
+        row = self._conn().execute(
+            "SELECT * FROM users WHERE name = ? ORDER BY user_id LIMIT 1", (name,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def all_users(self):
+        rows = self._conn().execute("SELECT * FROM users").fetchall()
+        return [dict(r) for r in rows]
+
+    def register_user(self, name, religion="", state=""):
+        now = datetime.now()
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            cur = conn.execute(
+                "INSERT INTO users (name, religion, state, title) VALUES (?, ?, ?, ?)",
+                (name, religion, state, title_for_points(0)),
+            )
+            user_id = cur.lastrowid
+            conn.execute(
+                "INSERT INTO activity (user_id, date, activity_type, points_earned, created_at) "
+                "VALUES (?, ?, 'register', 0, ?)",
+                (user_id, now.date().isoformat(), now.isoformat(timespec="seconds")),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return self.get_user(user_id)
+
+    # ---- events ----
+    def record_answer(self, user_id, correct, points, activity_type="riddle", when=None):
+        """
+        Applies one answer event. Correct answers add points and extend
+        the streak; incorrect answers reset the current streak.
+        Returns the updated user, or None for an unknown user.
+        """
+        when = when or datetime.now()
+        day = when.date().isoformat()
+        earned = int(points) if correct else 0
+
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT total_points, current_streak, longest_streak FROM users WHERE user_id = ?",
+                (user_id,),
+            ).fetchone()
+            if row is None:
+                conn.execute("ROLLBACK")
+                return None
+
+            total = row["total_points"] + earned
+            streak = row["current_streak"] + 1 if correct else 0
+            longest = max(row["longest_streak"], streak)
+
+            conn.execute(
+                "INSERT INTO activity (user_id, date, activity_type, points_earned, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (user_id, day, activity_type, earned, when.isoformat(timespec="seconds")),
+            )
+            conn.execute(
+                "UPDATE users SET total_points = ?, current_streak = ?, longest_streak = ?, "
+                "title = ?, last_activity_date = ? WHERE user_id = ?",
+                (total, streak, longest, title_for_points(total), day, user_id),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+        return self.get_user(user_id)
+
+    def last_activity_id(self):
+        return self._conn().execute(
+            "SELECT COALESCE(MAX(id), 0) FROM activity"
+        ).fetchone()[0]
+
+    def changed_users(self, since_id):
+        """
+        Returns (last_activity_id, users) for users with activity after
+        since_id. Lets in-memory views catch up with writes made by any
+        process without rescanning the whole table.
+        """
+        last_id = self.last_activity_id()
+        if last_id <= since_id:
+            return since_id, []
+
+        rows = self._conn().execute(
+            "SELECT * FROM users WHERE user_id IN "
+            "(SELECT DISTINCT user_id FROM activity WHERE id > ? AND id <= ?)",
+            (since_id, last_id),
+        ).fetchall()
+        return last_id, [dict(r) for r in rows]
+
+    def recent_activity(self, user_id, limit=20):
+        rows = self._conn().execute(
+            "SELECT date, activity_type, points_earned, created_at FROM activity "
+            "WHERE user_id = ? ORDER BY id DESC LIMIT ?",
+            (user_id, limit),
+        ).fetchall()
+        return [dict(r) for r in rows]
+
+    # ---- export ----
+    def export_users_csv(self, path=USERS_CSV):
+        """
+        Writes the current aggregates back in the users.csv layout.
+        """
+        tmp = path + ".tmp"
+        with open(tmp, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=USER_FIELDS)
+            writer.writeheader()
+            for user in self.all_users():
+                writer.writerow({k: user[k] for k in USER_FIELDS})
+        os.replace(tmp, path)
@@ -0,0 +1,172 @@
+import re
+import unicodedata
+
+import pandas as pd
+
+RIDDLES_CSV = "realistic_spiritual_riddles.csv"
+
+# Generic place words that players often leave out ("siddhivinayak"
+# instead of "siddhivinayak temple").
+GENERIC_WORDS = {
+    "temple", "temples", "mandir", "church", "cathedral", "basilica",
+    "mosque", "masjid", "dargah", "gurudwara", "sahib", "monastery",
+    "math", "complex", "shrine", "the", "sri", "shri",
+}
+
+# Extra accepted spellings, keyed by the normalized canonical answer.
+ANSWER_ALIASES = {
+    "tirupati balaji temple": ["tirumala", "venkateswara temple", "balaji"],
+    "golden temple": ["harmandir sahib", "darbar sahib"],
+    "iskcon temple imphal": ["iskcon imphal"],
+}
+
+_PUNCT = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+# -------- NORMALIZATION --------
+def normalize_answer(text):
+    """
+    Lowercases, strips diacritics and punctuation, collapses whitespace.
+    "Solomon’s  Témple!" -> "solomons temple"
+    """
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c))
+    text = text.lower().replace("'", "").replace("’", "")
+    text = _PUNCT.sub(" ", text)
+    return _SPACES.sub(" ", text).strip()
+
+
+def core_words(normalized):
+    """
+    Drops generic place words, keeping the distinctive part of a name.
+    """
+    words = [w for w in normalized.split() if w not in GENERIC_WORDS]
+    return " ".join(words)
+
+
+def allowed_distance(normalized):
+    """
+    Typo budget grows with answer length; short answers must be exact.
+    """
+    n = len(normalized)
+    if n <= 4:
+        return 0
+    if n <= 8:
+        return 1
+    return 2
+
+
+# -------- BOUNDED EDIT DISTANCE --------
+def bounded_levenshtein(a, b, limit):
+    """
+    Levenshtein distance between a and b, computed only inside the
+    diagonal band of width `limit`. Returns limit + 1 as soon as the
+    distance is known to exceed the limit.
+    """
+    if a == b:
+        return 0
+    la, lb = len(a), len(b)
+    if abs(la - lb) > limit:
+        return limit + 1
+    if la > lb:
+        a, b, la, lb = b, a, lb, la
+
+    big = limit + 1
+    prev = list(range(lb + 1))
+
+    for i in range(1, la + 1):
+        lo = max(1, i - limit)
+        hi = min(lb, i + limit)
+        cur = [big] * (lb + 1)
+        cur[0] = i if i <= limit else big
+        row_min = cur[0]
+        ca = a[i - 1]
+
+        for j in range(lo, hi + 1):
+            cost = 0 if ca == b[j - 1] else 1
+            v = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + cost)
+            cur[j] = v
+            if v < row_min:
+                row_min = v
+
+        if row_min > limit:
+            return big
+        prev = cur
+
+    return min(prev[lb], big)
+
+
+# -------- ANSWER TABLE --------
+class AnswerTable:
+    """
+    Precomputed accepted answers per riddle row.
+
+    Every riddle id maps to a set of normalized forms (the answer,
+    the landmark name, their core words and any aliases). Exact
+    matches are a set lookup; everything else falls back to the
+    bounded edit distance against those few forms.
+    """
+
+    def __init__(self, df):
+        self.answers = {}
+        self.forms = {}
+        self.points = {}
+
+        for riddle_id, row in df.iterrows():
+            answer = str(row.get("answer", "")).strip()
+            canonical = normalize_answer(answer)
+
+            forms = {canonical, normalize_answer(row.get("landmark", ""))}
+            forms.update(normalize_answer(a) for a in ANSWER_ALIASES.get(canonical, []))
+            forms.update([core_words(f) for f in forms])
+            forms.discard("")
+
+            self.answers[riddle_id] = answer
+            self.forms[riddle_id] = frozenset(forms)
+            try:
+                self.points[riddle_id] = int(row.get("points", 0))
+            except (TypeError, ValueError):
+                self.points[riddle_id] = 0
+
+    def __contains__(self, riddle_id):
+        return riddle_id in self.forms
+
+    def check(self, riddle_id, user_answer):
+        """
+        Returns {"correct", "distance", "answer", "points"} for one
+        submission. Raises KeyError for an unknown riddle id.
+        """
+        forms = self.forms[riddle_id]
+        guess = normalize_answer(user_answer)
+        best = 0 if guess in forms else None
+
+        if best is None and guess:
+            guess_core = core_words(guess) or guess
+            for form in forms:
+                limit = allowed_distance(form)
+                d = min(
+                    bounded_levenshtein(guess, form, limit),
+                    bounded_levenshtein(guess_core, form, limit),
+                )
+                if d <= limit and (best is None or d < best):
+                    best = d
+                    if best == 0:
+                        break
+
+        correct = best is not None
+        return {
+            "correct": correct,
+            "distance": best if correct else None,
+            "answer": self.answers[riddle_id],
+            "points": self.points[riddle_id] if correct else 0,
+        }
+
+
+def load_answer_table(df=None):
+    """
+    Builds the answer table from a riddle DataFrame (or the CSV).
+    """
+    if df is None:
+        df = pd.read_csv(RIDDLES_CSV).fillna("")
+    return AnswerTable(df)
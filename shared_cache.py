@@ -0,0 +1,200 @@
+"""
+Cache for generated content that every worker on a host shares.
+
+Backends store JSON-serialisable values under string keys with a TTL in
+seconds and implement get / set / add / delete. add() stores only when
+the key is absent (or expired) and returns whether it did, so workers
+racing on the same key agree on a single value.
+
+SHARED_CACHE selects the backend: "sqlite" (default, one WAL database
+file shared by all processes), "memory" (this process only) or "none".
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+
+import metrics
+
+SHARED_CACHE = os.environ.get("SHARED_CACHE", "sqlite")
+SHARED_CACHE_PATH = os.environ.get("SHARED_CACHE_PATH", "shared_cache.db")
+PURGE_INTERVAL = 300    # seconds between sweeps of expired rows
+
+# Generated quotes/stories/pathways are reused for CONTENT_TTL seconds;
+# translations are deterministic and kept much longer.
+CONTENT_TTL = float(os.environ.get("CONTENT_CACHE_TTL", "3600"))
+TRANSLATION_TTL = float(os.environ.get("TRANSLATION_CACHE_TTL", str(7 * 24 * 3600)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_expires ON cache (expires_at);
+"""
+
+
+class CacheBackend(ABC):
+    @abstractmethod
+    def get(self, key):
+        pass
+
+    @abstractmethod
+    def set(self, key, value, ttl):
+        pass
+
+    @abstractmethod
+    def add(self, key, value, ttl):
+        pass
+
+    @abstractmethod
+    def delete(self, key):
+        pass
+
+    def get_or_add(self, key, ttl, compute, name="shared"):
+        """
+        Returns the cached value, or computes and stores it. When another
+        worker stored a value first, that value is returned instead so
+        all workers serve the same content.
+        """
+        value = self.get(key)
+        if value is not None:
+            metrics.cache_hit(name)
+            return value
+        metrics.cache_miss(name)
+        value = compute()
+        if not self.add(key, value, ttl):
+            value = self.get(key) or value
+        return value
+
+
+# -------- BACKENDS --------
+class NullCache(CacheBackend):
+    def get(self, key):
+        return None
+
+    def set(self, key, value, ttl):
+        pass
+
+    def add(self, key, value, ttl):
+        return True
+
+    def delete(self, key):
+        pass
+
+
+class MemoryCache(CacheBackend):
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            if item[1] <= time.time():
+                del self._data[key]
+                return None
+            return item[0]
+
+    def set(self, key, value, ttl):
+        with self._lock:
+            self._data[key] = (value, time.time() + ttl)
+
+    def add(self, key, value, ttl):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and item[1] > time.time():
+                return False
+            self._data[key] = (value, time.time() + ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteCache(CacheBackend):
+    """
+    SQLite in WAL mode: readers never block the writer, and every worker
+    process opening the same file sees the same entries. Expired rows
+    are ignored on read and swept every PURGE_INTERVAL seconds.
+    """
+
+    def __init__(self, path=SHARED_CACHE_PATH):
+        self.path = path
+        self._local = threading.local()
+        self._next_purge = 0.0
+        self._conn().executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value FROM cache WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, key, value, ttl):
+        self._conn().execute(
+            "INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time() + ttl),
+        )
+        self._maybe_purge()
+
+    def add(self, key, value, ttl):
+        now = time.time()
+        # A single statement, so the check and the write are atomic
+        # across processes; an expired row is overwritten.
+        cur = self._conn().execute(
+            "INSERT INTO cache (key, value, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value, expires_at = excluded.expires_at "
+            "WHERE cache.expires_at <= ?",
+            (key, json.dumps(value), now + ttl, now),
+        )
+        self._maybe_purge()
+        return cur.rowcount == 1
+
+    def delete(self, key):
+        self._conn().execute("DELETE FROM cache WHERE key = ?", (key,))
+
+    def _maybe_purge(self):
+        now = time.time()
+        if now >= self._next_purge:
+            self._next_purge = now + PURGE_INTERVAL
+            self._conn().execute("DELETE FROM cache WHERE expires_at <= ?", (now,))
+
+
+def open_cache(kind=SHARED_CACHE):
+    if kind == "sqlite":
+        return SQLiteCache()
+    if kind == "memory":
+        return MemoryCache()
+    if kind == "none":
+        return NullCache()
+    raise ValueError(f"unknown SHARED_CACHE backend {kind!r}")
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_cache():
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = open_cache()
+    return _cache
@@ -0,0 +1,51 @@
+import threading
+from concurrent.futures import Future, CancelledError
+
+import metrics
+import tracing
+
+
+class SingleFlight:
+    """
+    Collapses concurrent calls with the same key into one execution.
+
+    The first caller for a key runs the function; callers arriving while
+    it runs wait on the same Future and get its result or its exception.
+    Nothing is kept once the call finishes, so this only deduplicates
+    work that is in flight at the same time.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, *args, **kwargs):
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            metrics.COALESCED_REQUESTS.inc(flight=self.name)
+            with tracing.span("coalesced_wait"):
+                return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            with self._lock:
+                del self._calls[key]
+            # Followers of a cancelled or interrupted leader must not hang
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                future.set_exception(CancelledError(f"{self.name} leader aborted"))
+            raise
+        with self._lock:
+            del self._calls[key]
+        future.set_result(result)
+        return result
+
@@ -0,0 +1,49 @@
+import os
+import threading
+import time
+
+# Seconds between file stat checks
+CHECK_INTERVAL = 2.0
+
+
+class CsvSnapshot:
+    """
+    A dataset file loaded into a DataFrame and reloaded when its size
+    or mtime changes (checked at most every CHECK_INTERVAL seconds).
+
+    get() returns (version, df); the version changes with every reload,
+    so derived caches can key on it.
+    """
+
+    def __init__(self, path, loader):
+        self.path = path
+        self.loader = loader
+        self._lock = threading.Lock()
+        self._checked = 0.0
+        self._version = None
+        self._df = None
+
+    def _stat(self):
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            return (0, 0)
+        return (st.st_mtime_ns, st.st_size)
+
+    def get(self):
+        now = time.monotonic()
+        if self._df is not None and now - self._checked < CHECK_INTERVAL:
+            return self._version, self._df
+
+        with self._lock:
+            if self._df is None or now - self._checked >= CHECK_INTERVAL:
+                version = self._stat()
+                if version != self._version:
+                    self._df = self.loader(self.path)
+                    self._version = version
+                self._checked = now
+        return self._version, self._df
+
+    @property
+    def df(self):
+        return self.get()[1]
@@ -0,0 +1,131 @@
+import gzip
+import hashlib
+import json
+import threading
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+
+import metrics
+import tracing
+from media_responses import etag_matches
+
+try:
+    import brotli
+except ImportError:     # gzip only
+    brotli = None
+
+# Clients may reuse a body for a minute, then revalidate with the ETag
+CACHE_CONTROL = "public, max-age=60"
+
+
+# -------- BODIES --------
+class PrecompressedBody:
+    """
+    One JSON payload serialized once, with its gzip and brotli forms.
+    Each encoding gets its own strong ETag derived from one hash of
+    the uncompressed bytes.
+    """
+
+    def __init__(self, payload):
+        with tracing.span("serialize"):
+            self.identity = json.dumps(
+                jsonable_encoder(payload),
+                ensure_ascii=False,
+                allow_nan=False,
+                separators=(",", ":"),
+            ).encode("utf-8")
+        digest = hashlib.sha256(self.identity).hexdigest()[:32]
+
+        with tracing.span("compress"):
+            self.encodings = {"gzip": gzip.compress(self.identity, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                self.encodings["br"] = brotli.compress(self.identity, quality=11)
+
+        self.etags = {None: f'"{digest}"'}
+        for coding in self.encodings:
+            self.etags[coding] = f'"{digest}-{coding}"'
+
+
+class SnapshotResponses:
+    """
+    Precompressed bodies per endpoint parameters. An entry is rebuilt
+    only when the dataset version it was built from changes.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self._bodies = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, version, build):
+        entry = self._bodies.get(key)
+        if entry is not None and entry[0] == version:
+            metrics.cache_hit(self.name)
+            return entry[1]
+
+        metrics.cache_miss(self.name)
+        body = PrecompressedBody(build())
+        with self._lock:
+            self._bodies[key] = (version, body)
+        return body
+
+
+# -------- NEGOTIATION --------
+def _accepted_encodings(header):
+    """
+    Parses Accept-Encoding into {coding: q}.
+    """
+    accepted = {}
+    for part in (header or "").split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding] = q
+    return accepted
+
+
+def choose_encoding(header, available):
+    """
+    Best of `available` ("br", "gzip") the client accepts, or None for
+    identity. Brotli wins ties since it is smaller.
+    """
+    accepted = _accepted_encodings(header)
+    best, best_q = None, 0.0
+    for coding in ("br", "gzip"):
+        if coding not in available:
+            continue
+        q = accepted.get(coding, accepted.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def respond(request, body, cache_control=CACHE_CONTROL):
+    """
+    304 when If-None-Match names any encoding of the body, otherwise
+    the body in the best encoding the client accepts.
+    """
+    coding = choose_encoding(request.headers.get("accept-encoding"), body.encodings)
+    headers = {
+        "ETag": body.etags[coding],
+        "Cache-Control": cache_control,
+        "Vary": "Accept-Encoding",
+    }
+    if_none_match = request.headers.get("if-none-match")
+    if any(etag_matches(if_none_match, etag) for etag in body.etags.values()):
+        return Response(status_code=304, headers=headers)
+
+    if coding is None:
+        return Response(body.identity, media_type="application/json", headers=headers)
+
+    headers["Content-Encoding"] = coding
+    return Response(body.encodings[coding], media_type="application/json", headers=headers)
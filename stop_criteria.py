@@ -0,0 +1,77 @@
+"""
+Structural stop conditions for streamed generation.
+
+Callers describe when their output is complete with a small JSON-safe
+spec, passed to a generation backend as stop_when=...:
+
+    {"sentences": 5, "min_words": 6}    five complete sentences of 6+ words
+    {"sentences": 2, "terminators": "."} two ". "-separated sentences
+    {"steps": 8}                        stop as step 9 begins
+
+The backend streams tokens into the criterion and halts decoding once
+it is satisfied, instead of spending the whole max_tokens budget on text
+the cleaners throw away. Specs mirror what clean_output keeps.
+"""
+
+import re
+
+STOP_REASON = "stop_criteria"
+
+
+class SentenceLimit:
+    """
+    Satisfied after `count` complete sentences with at least `min_words`
+    words. A sentence is complete once its terminator is followed by
+    whitespace, so "3.5" or a trailing "Dr." does not end it early.
+    """
+
+    def __init__(self, count, min_words=0, terminators=".!?"):
+        self.count = count
+        self.min_words = min_words
+        self._split = re.compile(rf"(?<=[{re.escape(terminators)}])\s+")
+        self.text = ""
+        self._scanned = 0
+        self._found = 0
+
+    def feed(self, chunk):
+        self.text += chunk
+        # Only the tail after the last complete sentence can change
+        parts = self._split.split(self.text[self._scanned:])
+        for part in parts[:-1]:
+            if len(part.split()) >= self.min_words:
+                self._found += 1
+        if len(parts) > 1:
+            self._scanned = len(self.text) - len(parts[-1])
+        return self._found >= self.count
+
+
+class StepLimit:
+    """
+    Satisfied when the marker of step count+1 ("9. ") starts the text
+    or a line. Numbers inside a step ("Chapter 12. Then") are ignored.
+    """
+
+    def __init__(self, count):
+        self.count = count
+        self.text = ""
+        self._marker = re.compile(rf"^[ \t]*{count + 1}\.\s", re.MULTILINE)
+
+    def feed(self, chunk):
+        self.text += chunk
+        # The marker may straddle chunks; "^" still only matches at a
+        # real line start when searching from an offset
+        start = max(0, len(self.text) - len(chunk) - 16)
+        return self._marker.search(self.text, start) is not None
+
+
+def build(spec):
+    if "steps" in spec:
+        return StepLimit(spec["steps"])
+    if "sentences" in spec:
+        return SentenceLimit(
+            spec["sentences"],
+            min_words=spec.get("min_words", 0),
+            terminators=spec.get("terminators", ".!?"),
+        )
+    raise ValueError(f"unknown stop spec {spec!r}")
+
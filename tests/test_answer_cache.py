@@ -0,0 +1,79 @@
+import unittest
+
+import answer_cache
+
+try:
+    import sklearn  # noqa: F401
+    import scipy  # noqa: F401
+except ImportError:
+    sklearn = None
+
+STOP_WORDS = {"why", "do", "i", "how", "about", "the", "with"}
+
+
+def terms(question):
+    return answer_cache.question_terms(answer_cache.normalize_question(question, STOP_WORDS))
+
+
+class SameQuestionTest(unittest.TestCase):
+    def test_negation_is_a_different_question(self):
+        self.assertFalse(answer_cache.same_question(
+            terms("why do I not feel anxious about the future"),
+            terms("why do I feel anxious about the future"),
+        ))
+
+    def test_one_letter_word_change_is_a_different_question(self):
+        self.assertFalse(answer_cache.same_question(
+            terms("how do I deal with danger"),
+            terms("how do I deal with anger"),
+        ))
+
+    def test_inflections_and_typos_match(self):
+        self.assertTrue(answer_cache.same_question(
+            terms("why do I feel anxious about the futures"),
+            terms("why do I feel anxous about the future"),
+        ))
+
+    def test_contracted_negation_matches_not(self):
+        self.assertTrue(answer_cache.same_question(
+            terms("why don't I feel calm"),
+            terms("why do I not feel calm"),
+        ))
+
+
+@unittest.skipIf(sklearn is None, "scikit-learn and scipy are required")
+class SemanticAnswerCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.cache = answer_cache.SemanticAnswerCache(threshold=0.8)
+
+    def test_negated_question_misses(self):
+        self.cache.put("Hinduism", "Bhagavad Gita", "why do I feel anxious about the future", "a")
+        self.assertIsNone(self.cache.get(
+            "Hinduism", ["Bhagavad Gita"], "why do I not feel anxious about the future"
+        ))
+
+    def test_similar_word_misses(self):
+        self.cache.put("Hinduism", "Bhagavad Gita", "how do I deal with anger", "a")
+        self.assertIsNone(self.cache.get("Hinduism", ["Bhagavad Gita"], "how do I deal with danger"))
+
+    def test_rephrased_question_hits(self):
+        self.cache.put("Hinduism", "Bhagavad Gita", "why do I feel anxious about the future", "a")
+        self.assertEqual(
+            self.cache.get("Hinduism", ["Bhagavad Gita"], "Why do I feel anxious about my future?"),
+            ("Bhagavad Gita", "a"),
+        )
+
+    def test_eviction_across_restacks(self):
+        cache = answer_cache.SemanticAnswerCache(threshold=0.8, max_entries=100)
+        for i in range(300):
+            cache.put("Hinduism", "Bhagavad Gita", f"question number {i} about duty", str(i))
+        self.assertEqual(len(cache), 100)
+        self.assertIsNone(cache.get("Hinduism", ["Bhagavad Gita"], "question number 5 about duty"))
+        self.assertEqual(
+            cache.get("Hinduism", ["Bhagavad Gita"], "question number 250 about duty"),
+            ("Bhagavad Gita", "250"),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+import unittest
+
+import stop_criteria
+
+
+def feed_all(criterion, text, chunk_size=3):
+    for i in range(0, len(text), chunk_size):
+        if criterion.feed(text[i:i + chunk_size]):
+            return True
+    return False
+
+
+class StepLimitTest(unittest.TestCase):
+    def test_stops_when_next_step_begins(self):
+        text = "".join(f"{i}. Practise step {i} daily.\n" for i in range(1, 10))
+        criterion = stop_criteria.StepLimit(8)
+        self.assertTrue(feed_all(criterion, text))
+        self.assertIn("9. ", criterion.text)
+        self.assertNotIn("Practise step 9", criterion.text)
+
+    def test_numbers_inside_a_step_do_not_stop(self):
+        text = (
+            "1. Study Bhagavad Gita Chapter 12. Then reflect on devotion.\n"
+            "2. Observe the 10. restraints of the yamas and niyamas.\n"
+            "3. Meditate on verse 47. of chapter 2.\n"
+        )
+        self.assertFalse(feed_all(stop_criteria.StepLimit(8), text))
+
+    def test_marker_split_across_chunks(self):
+        criterion = stop_criteria.StepLimit(2)
+        for chunk in ["1. One step here.\n2. Two", " steps here.\n", "3", ".", " Three"]:
+            stopped = criterion.feed(chunk)
+        self.assertTrue(stopped)
+
+
+class SentenceLimitTest(unittest.TestCase):
+    def test_counts_only_long_enough_sentences(self):
+        criterion = stop_criteria.SentenceLimit(1, min_words=6)
+        self.assertFalse(feed_all(criterion, "Be calm. "))
+        self.assertTrue(feed_all(criterion, "Peace comes from within the quiet mind. "))
+
+    def test_decimal_does_not_end_a_sentence(self):
+        criterion = stop_criteria.SentenceLimit(1)
+        self.assertFalse(feed_all(criterion, "About 3.5 percent"))
+
+
+if __name__ == "__main__":
+    unittest.main()
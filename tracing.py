@@ -0,0 +1,115 @@
+import contextvars
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_SAMPLE_RATE = float(os.environ.get("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_BUFFER_SIZE = int(os.environ.get("TRACE_BUFFER_SIZE", "500"))
+
+_current = contextvars.ContextVar("trace", default=None)
+
+
+# -------- TRACE --------
+class Trace:
+    """
+    Stage timings for one request. Spans with the same name (e.g. one
+    "generate" per belief) are summed and counted.
+    """
+
+    def __init__(self, method, path):
+        self.method = method
+        self.path = path
+        self.route = path
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.total = None
+        self.status = None
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, seconds):
+        with self._lock:
+            total, count = self.stages.get(name, (0.0, 0))
+            self.stages[name] = (total + seconds, count + 1)
+
+    def finish(self, status, route=None):
+        self.total = time.perf_counter() - self._start
+        self.status = status
+        if route:
+            self.route = route
+
+    def as_dict(self):
+        stages = {
+            name: {"ms": round(total * 1000, 3), "count": count}
+            for name, (total, count) in self.stages.items()
+        }
+        return {
+            "method": self.method,
+            "path": self.path,
+            "route": self.route,
+            "status": self.status,
+            "started_at": self.started_at,
+            "total_ms": round(self.total * 1000, 3) if self.total is not None else None,
+            "stages": stages,
+        }
+
+    def server_timing(self):
+        """
+        Server-Timing header value, e.g. "prompt;dur=0.05, generate;dur=812.4".
+        """
+        parts = [
+            f"{name};dur={total * 1000:.3f}"
+            for name, (total, _) in self.stages.items()
+        ]
+        if self.total is not None:
+            parts.append(f"total;dur={self.total * 1000:.3f}")
+        return ", ".join(parts)
+
+
+def start(method, path):
+    trace = Trace(method, path)
+    _current.set(trace)
+    return trace
+
+
+def current():
+    return _current.get()
+
+
+@contextmanager
+def span(name):
+    """
+    Times the enclosed block as stage `name` of the current request.
+    A no-op outside a traced request.
+    """
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    start_time = time.perf_counter()
+    try:
+        yield
+    finally:
+        trace.add(name, time.perf_counter() - start_time)
+
+
+# -------- RING BUFFER --------
+_recent = deque(maxlen=TRACE_BUFFER_SIZE)
+
+
+def record(trace, force=False):
+    """
+    Keeps a sampled subset of finished traces in memory.
+    """
+    if force or random.random() < TRACE_SAMPLE_RATE:
+        _recent.append(trace.as_dict())
+
+
+def recent(limit=50, route=None):
+    traces = list(_recent)
+    if route:
+        traces = [t for t in traces if t["route"] == route]
+    return traces[-limit:][::-1]
@@ -1,17 +1,53 @@
+import os
 import streamlit as st
 import pandas as pd
 import folium
 from streamlit_folium import st_folium
-from geopy.distance import geodesic
 import geocoder
 
+import trip_planner
+import geo_cache
+
 # ---------------- CONFIG ----------------
 CSV_FILE = "india_religious_landmarks_phase1_full.csv"
+DAY_COLORS = ["blue", "green", "purple", "orange", "darkred"]
 st.set_page_config(page_title="India Religious Landmarks Planner", layout="wide")
 
 # ---------------- LOAD DATA ----------------
-df = pd.read_csv(CSV_FILE)
-df['religion'] = df['religion'].str.strip().str.title()
+# Cached per file version: reruns reuse the parsed frame until the CSV changes
+@st.cache_data
+def load_landmarks(path, mtime):
+    df = pd.read_csv(path)
+    df['religion'] = df['religion'].str.strip().str.title()
+    return df
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def detect_location():
+    g = geocoder.ip('me')
+    if g.ok:
+        return tuple(g.latlng)
+    return trip_planner.DEFAULT_LOCATION
+
+@st.cache_data(max_entries=geo_cache.GEO_CACHE_SIZE)
+def filtered_landmarks(mtime, religion, state, cell):
+    """
+    Landmarks matching the filters, sorted by distance from the centre
+    of the user's geohash cell. Keyed by cell and filters, so nearby
+    users and widget changes elsewhere on the page reuse one result.
+    """
+    lat, lon = geo_cache.decode_center(cell)
+    filtered = load_landmarks(CSV_FILE, mtime)
+
+    if religion != "All":
+        filtered = filtered[filtered["religion"] == religion]
+
+    if state != "All":
+        filtered = filtered[filtered["state"] == state]
+
+    return trip_planner.with_distances(filtered, lat, lon)
+
+mtime = os.path.getmtime(CSV_FILE)
+df = load_landmarks(CSV_FILE, mtime)
 
 # ---------------- SIDEBAR FILTERS ----------------
 st.sidebar.header("Filter Landmarks")
@@ -22,188 +58,109 @@ selected_religion = st.sidebar.selectbox("Select Religion", ["All"] + religions)
 selected_state = st.sidebar.selectbox("Select State", ["All"] + states)
 
 # ---------------- USER LOCATION ----------------
-g = geocoder.ip('me')
-if g.ok:
-    user_lat, user_lon = g.latlng
-else:
-    user_lat, user_lon = 20.5937, 78.9629
-
+user_lat, user_lon = detect_location()
 st.sidebar.write(f"Detected Location: {user_lat:.4f}, {user_lon:.4f}")
 
-# ---------------- FILTER DATA ----------------
-filtered = df.copy()
-
-if selected_religion != "All":
-    filtered = filtered[filtered["religion"] == selected_religion]
-
-if selected_state != "All":
-    filtered = filtered[filtered["state"] == selected_state]
-
-# ---------------- DISTANCE CALCULATION ----------------
-def calc_distance(row):
-    return geodesic((user_lat, user_lon), (row["latitude"], row["longitude"])).km
-
-if not filtered.empty:
-    filtered["distance_km"] = filtered.apply(calc_distance, axis=1)
-    filtered = filtered.sort_values("distance_km")
+filtered = filtered_landmarks(
+    mtime, selected_religion, selected_state, geo_cache.encode(user_lat, user_lon)
+)
 
 # ---------------- UI ----------------
 st.title("🕌 India Religious Landmarks Planner")
 
+# One table element instead of a block per landmark keeps reruns flat
 st.subheader("🏛 Landmark List")
-for _, row in filtered.iterrows():
-    st.markdown(f"### {row['name']}")
-    st.write(f"**Religion:** {row['religion']} | **State:** {row['state']} | **City:** {row['city']}")
-    st.write(f"**Distance:** {row['distance_km']:.2f} km")
-    st.markdown("---")
-
-# ---------------- ITINERARY SETTINGS ----------------
-st.subheader("🤖 AI Travel Itinerary Generator")
-num_days = st.selectbox("Select Number of Days", [1, 2, 3, 4, 5])
-
-itinerary_mode = st.radio(
-    "Itinerary Mode",
-    ["Auto AI Itinerary", "Manual Landmark Selection"]
+st.dataframe(
+    filtered[["name", "religion", "state", "city", "distance_km"]],
+    column_config={
+        "name": "Landmark",
+        "religion": "Religion",
+        "state": "State",
+        "city": "City",
+        "distance_km": st.column_config.NumberColumn("Distance (km)", format="%.2f"),
+    },
+    hide_index=True,
+    use_container_width=True,
 )
 
-if "itinerary" not in st.session_state:
-    st.session_state.itinerary = {}
-
 # =========================================================
-# MANUAL MODE
+# ITINERARY MAP
 # =========================================================
-if itinerary_mode == "Manual Landmark Selection":
-
-    selected_landmarks = st.multiselect(
-        "Select Landmarks",
-        options=filtered["name"].tolist()
-    )
-
-    generate_button = st.button("Generate Itinerary")
+def itinerary_map(itinerary):
+    """
+    All days on one map: the start point, one marker per day and a
+    coloured leg from each day's start to its landmark.
+    """
+    start = itinerary[0]["start"]
+    points = [start] + [[d["latitude"], d["longitude"]] for d in itinerary]
+
+    trip_map = folium.Map(location=start, zoom_start=6)
+    trip_map.fit_bounds(points)
+
+    folium.Marker(
+        start,
+        popup="Start Location",
+        icon=folium.Icon(color="red")
+    ).add_to(trip_map)
+
+    for d in itinerary:
+        color = DAY_COLORS[(d["day"] - 1) % len(DAY_COLORS)]
+        destination = [d["latitude"], d["longitude"]]
 
-    if generate_button:
-
-        if not selected_landmarks:
-            st.warning("Please select at least one landmark.")
-        else:
-            remaining = filtered[filtered["name"].isin(selected_landmarks)].copy()
-            day_itinerary = {}
-            current_location = (user_lat, user_lon)
-
-            for day in range(1, num_days + 1):
-
-                if remaining.empty:
-                    break
-
-                # Find nearest from current location
-                remaining["temp_distance"] = remaining.apply(
-                    lambda row: geodesic(
-                        current_location,
-                        (row["latitude"], row["longitude"])
-                    ).km,
-                    axis=1
-                )
-
-                nearest = remaining.sort_values("temp_distance").iloc[0]
-
-                day_itinerary[f"Day {day}"] = {
-                    "start": current_location,
-                    "place": nearest
-                }
-
-                current_location = (
-                    nearest["latitude"],
-                    nearest["longitude"]
-                )
+        folium.Marker(
+            destination,
+            popup=f"Day {d['day']}: {d['name']}",
+            tooltip=f"Day {d['day']}",
+            icon=folium.Icon(color=color)
+        ).add_to(trip_map)
 
-                remaining = remaining[remaining["name"] != nearest["name"]]
+        folium.PolyLine([d["start"], destination], color=color, weight=3).add_to(trip_map)
 
-            st.session_state.itinerary = day_itinerary
+    return trip_map
 
 # =========================================================
-# AUTO MODE
+# ITINERARY GENERATOR
 # =========================================================
-else:
+# A fragment: its widgets rerun only this section, not the landmark list
+@st.fragment
+def itinerary_section(filtered, user_location):
+    st.subheader("🤖 AI Travel Itinerary Generator")
+    num_days = st.selectbox("Select Number of Days", [1, 2, 3, 4, 5])
+
+    itinerary_mode = st.radio(
+        "Itinerary Mode",
+        ["Auto AI Itinerary", "Manual Landmark Selection"]
+    )
 
-    generate_button = st.button("Generate Itinerary")
+    if "itinerary" not in st.session_state:
+        st.session_state.itinerary = []
 
-    if generate_button:
+    candidates = filtered
+    if itinerary_mode == "Manual Landmark Selection":
+        selected_landmarks = st.multiselect(
+            "Select Landmarks",
+            options=filtered["name"].tolist()
+        )
+        candidates = filtered[filtered["name"].isin(selected_landmarks)]
 
-        if filtered.empty:
+    if st.button("Generate Itinerary"):
+        if itinerary_mode == "Manual Landmark Selection" and candidates.empty:
+            st.warning("Please select at least one landmark.")
+        elif candidates.empty:
             st.warning("No landmarks available.")
         else:
-            remaining = filtered.copy()
-            day_itinerary = {}
-            current_location = (user_lat, user_lon)
-
-            for day in range(1, num_days + 1):
-
-                if remaining.empty:
-                    break
-
-                remaining["temp_distance"] = remaining.apply(
-                    lambda row: geodesic(
-                        current_location,
-                        (row["latitude"], row["longitude"])
-                    ).km,
-                    axis=1
-                )
-
-                nearest = remaining.sort_values("temp_distance").iloc[0]
-
-                day_itinerary[f"Day {day}"] = {
-                    "start": current_location,
-                    "place": nearest
-                }
+            st.session_state.itinerary = trip_planner.plan_itinerary(
+                candidates, user_location, num_days
+            )
 
-                current_location = (
-                    nearest["latitude"],
-                    nearest["longitude"]
-                )
-
-                remaining = remaining[remaining["name"] != nearest["name"]]
-
-            st.session_state.itinerary = day_itinerary
-
-# =========================================================
-# DISPLAY ITINERARY
-# =========================================================
-if st.session_state.itinerary:
-
-    for day, data in st.session_state.itinerary.items():
-
-        st.markdown(f"## {day}")
-
-        place = data["place"]
-        start_location = data["start"]
-
-        st.write(f"🏛 {place['name']} ({place['city']}, {place['state']})")
-
-        route = [
-            [start_location[0], start_location[1]],
-            [place["latitude"], place["longitude"]]
-        ]
-
-        day_map = folium.Map(location=route[0], zoom_start=6)
-        day_map.fit_bounds(route)
-
-        # Start marker
-        folium.Marker(
-            route[0],
-            popup="Start Location",
-            icon=folium.Icon(color="red")
-        ).add_to(day_map)
-
-        # Destination marker
-        folium.Marker(
-            route[1],
-            popup=place["name"],
-            icon=folium.Icon(color="blue")
-        ).add_to(day_map)
+    itinerary = st.session_state.itinerary
+    if itinerary:
+        for d in itinerary:
+            st.markdown(f"**Day {d['day']}** — 🏛 {d['name']} ({d['city']}, {d['state']}) · {d['distance_km']:.2f} km")
 
-        # Route line
-        folium.PolyLine(route, color="green", weight=3).add_to(day_map)
+        # returned_objects=[] stops map pans and zooms from triggering reruns
+        st_folium(itinerary_map(itinerary), width=700, height=500, returned_objects=[])
 
-        st_folium(day_map, width=700, height=500)
+        st.success("✅ Itinerary Generated Successfully!")
 
-    st.success("✅ Itinerary Generated Successfully!")
\ No newline at end of file
+itinerary_section(filtered, (user_lat, user_lon))
@@ -0,0 +1,70 @@
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Centre of India, used when the visitor's location is unknown
+DEFAULT_LOCATION = (20.5937, 78.9629)
+
+
+def distances_km(lat, lon, latitudes, longitudes):
+    """
+    Great-circle (haversine) distances from one point to many, in km.
+    Within 0.5% of the geodesic distances geopy reports, at a fraction
+    of the cost.
+    """
+    lat1, lon1 = np.radians(lat), np.radians(lon)
+    lat2 = np.radians(np.asarray(latitudes, dtype=float))
+    lon2 = np.radians(np.asarray(longitudes, dtype=float))
+
+    a = (
+        np.sin((lat2 - lat1) / 2) ** 2
+        + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+
+def with_distances(df, lat, lon):
+    """
+    Copy of the landmarks sorted by distance, with a distance_km column.
+    """
+    if df.empty:
+        return df.assign(distance_km=[])
+    out = df.assign(distance_km=distances_km(lat, lon, df["latitude"], df["longitude"]))
+    return out.sort_values("distance_km", kind="stable")
+
+
+def plan_itinerary(df, start, num_days):
+    """
+    Greedy nearest-neighbour trip: each day visits the closest
+    unvisited landmark to the previous stop. Returns one dict per day.
+    """
+    if df.empty:
+        return []
+
+    names = df["name"].tolist()
+    cities = df["city"].tolist()
+    states = df["state"].tolist()
+    latitudes = df["latitude"].to_numpy(dtype=float)
+    longitudes = df["longitude"].to_numpy(dtype=float)
+    visited = np.zeros(len(names), dtype=bool)
+
+    days = []
+    current = start
+    for day in range(1, min(num_days, len(names)) + 1):
+        dist = distances_km(current[0], current[1], latitudes, longitudes)
+        dist[visited] = np.inf
+        i = int(dist.argmin())
+        visited[i] = True
+
+        days.append({
+            "day": day,
+            "start": [float(current[0]), float(current[1])],
+            "name": names[i],
+            "city": cities[i],
+            "state": states[i],
+            "latitude": float(latitudes[i]),
+            "longitude": float(longitudes[i]),
+            "distance_km": round(float(dist[i]), 2),
+        })
+        current = (latitudes[i], longitudes[i])
+    return days
@@ -0,0 +1,185 @@
+"""
+Daily wisdom generation and translation, shared by the API (main.py)
+and the Streamlit app (ai_features.py). Importing it loads no model.
+"""
+
+import re
+import hashlib
+import model_backends
+import shared_cache
+import metrics
+import tracing
+
+# ---------------- CONFIG ----------------
+MAX_TOKENS_QUOTE = 60
+MAX_TOKENS_STORY = 220
+MAX_TOKENS_PATHWAY = 600
+
+# Stop decoding once clean_output has everything it keeps
+STOP_WHEN = {
+    "Quote": {"sentences": 1, "min_words": 6},
+    "Short Story": {"sentences": 5, "min_words": 6},
+    "Pathway": {"steps": 8},
+}
+
+BELIEFS = {
+    "Hinduism": ["Bhagavad Gita", "Upanishads", "Yoga Vasistha"],
+    "Buddhism": ["Sutta Nipata", "Majjhima Nikaya"],
+    "Jainism": ["Acaranga Sutra", "Samayasara"],
+    "Christianity": ["Bible"],
+    "Islam": ["Quran"],
+    "Atheism": ["The Age of Reason", "Human Values"]
+}
+
+# ---------------- LANGUAGES ----------------
+LANGUAGES = {
+    "English": "eng_Latn",
+    "Hindi": "hin_Deva",
+    "Tamil": "tam_Taml",
+    "Telugu": "tel_Telu",
+    "Kannada": "kan_Knda",
+    "Malayalam": "mal_Mlym",
+    "Bengali": "ben_Beng",
+    "Gujarati": "guj_Gujr",
+    "Marathi": "mar_Deva",
+    "Punjabi": "pan_Guru",
+    "Urdu": "urd_Arab"
+}
+
+# ---------------- PROMPT ----------------
+def build_prompt(belief, book, content_type):
+    if content_type == "Quote":
+        return (
+            f"Generate ONE philosophical quote inspired by {book} of {belief}. "
+            f"Single sentence only. Deep and reflective."
+        )
+
+    elif content_type == "Short Story":
+        return (
+            f"Generate a short philosophical story inspired by {book} of {belief}. "
+            f"3 to 5 sentences. Reflective and parable-like."
+        )
+
+    elif content_type == "Pathway":
+        return (
+            f"You are a traditional spiritual master.\n"
+            f"Create a structured spiritual roadmap for attaining the highest spiritual goal "
+            f"in {belief}, based strictly on teachings from {book}.\n\n"
+            f"The roadmap must:\n"
+            f"- Contain 6 to 8 numbered steps.\n"
+            f"- Show spiritual progression from beginner to advanced level.\n"
+            f"- Include real concepts, practices, or doctrines from {book}.\n"
+            f"- End with the final spiritual realization (moksha, enlightenment, salvation, or divine union depending on the tradition).\n\n"
+            f"Start from foundational discipline and move toward ultimate realization.\n"
+            f"Number each step clearly from 1.\n"
+            f"Do not give general moral advice. Focus on spiritual advancement.\n"
+        )
+
+# ---------------- CLEAN OUTPUT ----------------
+def clean_output(text, content_type):
+    text = text.strip()
+    text = text.replace('"', '').replace("“", "").replace("”", "")
+    text = re.sub(r"\s+", " ", text)
+
+    if content_type in ["Quote", "Short Story"]:
+        sentences = re.split(r'(?<=[.!?]) +', text)
+        clean_sentences = [s.strip() for s in sentences if len(s.split()) > 5]
+        if content_type == "Quote":
+            return clean_sentences[0] + "." if clean_sentences else text
+        return " ".join(clean_sentences[:5])
+
+    if content_type == "Pathway":
+
+        steps = re.findall(r'\d+\.\s(.*?)(?=\d+\.|$)', text)
+        steps = [s.strip() for s in steps if len(s.split()) > 4]
+
+        if len(steps) < 3:
+            sentences = re.split(r'(?<=[.!?]) +', text)
+            steps = [s.strip() for s in sentences if len(s.split()) > 6]
+
+        # Remove incomplete last step
+        if steps:
+            last_step = steps[-1]
+            if (
+                last_step.endswith("-") or
+                last_step.endswith("(") or
+                last_step.count("(") > last_step.count(")")
+            ):
+                steps = steps[:-1]
+
+        if not steps:
+            return text.strip()
+
+        steps = steps[:8]
+
+        numbered = [f"{i}. {step}" for i, step in enumerate(steps, 1)]
+        return "\n".join(numbered)
+
+# ---------------- GENERATE ----------------
+def generate_content(prompt, max_tokens, content_type):
+
+    full_prompt = (
+        "You are a wise spiritual philosopher.\n\n"
+        + prompt +
+        "\n\nAnswer:"
+    )
+
+    with metrics.CONTENT_LATENCY.time(kind=content_type):
+        with tracing.span("generate"):
+            output = model_backends.get_generator("wisdom")(
+                full_prompt,
+                max_tokens=max_tokens,
+                temperature=0.35 if content_type == "Pathway" else 0.7,
+                stop_when=STOP_WHEN.get(content_type)
+            )
+
+        generated = output['choices'][0]['text']
+        with tracing.span("clean"):
+            return clean_output(generated, content_type)
+
+# ---------------- TRANSLATE ----------------
+def translation_key(text, lang_code):
+    return f"translation:{lang_code}:{hashlib.sha256(text.encode('utf-8')).hexdigest()}"
+
+def translate_text(text, target_lang):
+
+    if target_lang == "English":
+        return text
+
+    lang_code = LANGUAGES[target_lang]
+    with tracing.span("translate"):
+        return shared_cache.get_cache().get_or_add(
+            translation_key(text, lang_code),
+            shared_cache.TRANSLATION_TTL,
+            lambda: model_backends.get_translator().translate(text, lang_code),
+            name="translations"
+        )
+
+def translate_many(text, target_langs):
+    """
+    Translations of one text into several languages. Cached ones are
+    reused; the rest are translated together with one encoder pass.
+    """
+    cache = shared_cache.get_cache()
+    results = {}
+    missing = {}
+    for lang in target_langs:
+        if lang == "English":
+            results[lang] = text
+            continue
+        cached = cache.get(translation_key(text, LANGUAGES[lang]))
+        if cached is None:
+            metrics.cache_miss("translations")
+            missing[LANGUAGES[lang]] = lang
+        else:
+            metrics.cache_hit("translations")
+            results[lang] = cached
+
+    if missing:
+        with tracing.span("translate"):
+            translated = model_backends.get_translator().translate_many(text, list(missing))
+        for lang_code, lang in missing.items():
+            results[lang] = translated[lang_code]
+            cache.add(translation_key(text, lang_code), results[lang], shared_cache.TRANSLATION_TTL)
+
+    return {lang: results[lang] for lang in target_langs}